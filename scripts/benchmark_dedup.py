@@ -0,0 +1,71 @@
+"""Benchmark near-duplicate search at corpus scale.
+
+Generates synthetic int8 fingerprints (with a shared offset, like the
+common spectral tilt of real clips) plus perturbed copies, then times the
+LSH index against brute force on a subsample and reports recall.
+
+    python scripts/benchmark_dedup.py --size 200000 --duplicates 0.02
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.dedup import DuplicateIndex
+from data_processing.features import FINGERPRINT_BANDS, FINGERPRINT_SEGMENTS
+
+
+def make_fingerprints(size, duplicate_share, rng):
+    dims = FINGERPRINT_BANDS * FINGERPRINT_SEGMENTS
+    n_copies = int(size * duplicate_share)
+    base = rng.normal(size=(size - n_copies, dims)) + rng.normal(size=dims)
+    sources = rng.choice(len(base), size=n_copies, replace=False)
+    copies = base[sources] + rng.normal(scale=0.1, size=(n_copies, dims))
+    fingerprints = np.vstack([base, copies])
+    fingerprints = np.round(fingerprints / np.abs(fingerprints).max() * 127).astype(np.int8)
+    truth = {(int(s), len(base) + i) for i, s in enumerate(sources)}
+    return fingerprints, truth
+
+
+def build_index(fingerprints, **kwargs):
+    index = DuplicateIndex(**kwargs)
+    for i, fingerprint in enumerate(fingerprints):
+        index.add(str(i), fingerprint)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--duplicates", type=float, default=0.02)
+    parser.add_argument("--brute-force-sample", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    fingerprints, truth = make_fingerprints(args.size, args.duplicates, rng)
+    print(f"{args.size} fingerprints, {len(truth)} planted near duplicates, "
+          f"{fingerprints.nbytes / 1e6:.1f} MB")
+
+    index = build_index(fingerprints, brute_force_limit=0)
+    start = time.perf_counter()
+    pairs = index.near_duplicate_pairs()
+    lsh_seconds = time.perf_counter() - start
+    found = {tuple(p) for p in pairs.tolist()}
+    recall = len(truth & found) / len(truth)
+    print(f"LSH:         {lsh_seconds:7.2f}s  pairs={len(found)}  recall={recall:.4f}")
+
+    sample = fingerprints[:args.brute_force_sample]
+    start = time.perf_counter()
+    build_index(sample, brute_force_limit=len(sample)).near_duplicate_pairs()
+    brute_seconds = time.perf_counter() - start
+    projected = brute_seconds * (args.size / len(sample)) ** 2
+    print(f"Brute force: {brute_seconds:7.2f}s on {len(sample)} "
+          f"(~{projected:.0f}s projected for {args.size})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark feature extraction cost per feature set.
+
+Each feature set is timed on its own (including the shared STFT it needs)
+and the named configs are timed end to end, on synthetic 3 s clips.
+
+    python scripts/benchmark_features.py --clips 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.audio_processor import AudioProcessor
+from data_processing.features import FEATURE_CONFIGS, FEATURE_SETS
+
+
+def time_extraction(processor, clips):
+    start = time.perf_counter()
+    for audio in clips:
+        processor.compute_features(audio)
+    return (time.perf_counter() - start) / len(clips) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sample_rate, duration = 22050, 3
+    clips = [
+        (rng.normal(size=sample_rate * duration) * 0.1).astype(np.float32)
+        for _ in range(args.clips)
+    ]
+    AudioProcessor().warm_up()
+
+    print(f"{'feature set':<20} {'dims':>5} {'ms/clip':>9}")
+    for name, (_, size) in FEATURE_SETS.items():
+        processor = AudioProcessor(feature_sets=[name])
+        print(f"{name:<20} {size:>5} {time_extraction(processor, clips):>9.2f}")
+
+    print()
+    for name in FEATURE_CONFIGS:
+        processor = AudioProcessor(feature_sets=name)
+        dims = processor.schema["n_features"]
+        print(f"config:{name:<13} {dims:>5} {time_extraction(processor, clips):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark the drift-triggered retraining cycle with a cold and warm feature cache.
+
+Builds a synthetic labelled corpus of tones, trains an initial model, logs
+shifted "live" traffic, then times the drift check and two retraining
+cycles: one after adding new clips (only those are featurized) and one
+with nothing new.
+
+    python scripts/benchmark_retraining.py --clips 150 --new-clips 30
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+CLASSES = {"Negative": 220.0, "Neutral": 440.0, "Positive": 880.0}
+SAMPLE_RATE = 22050
+
+
+def write_clips(data_dir, n_clips, rng, start=0):
+    for i in range(start, start + n_clips):
+        label, freq = list(CLASSES.items())[i % len(CLASSES)]
+        t = np.arange(SAMPLE_RATE * 3) / SAMPLE_RATE
+        audio = 0.3 * np.sin(2 * np.pi * freq * (1 + rng.normal(0, 0.05)) * t)
+        audio += rng.normal(0, 0.05, size=t.shape)
+        (data_dir / label).mkdir(parents=True, exist_ok=True)
+        sf.write(data_dir / label / f"{i}.wav", audio, SAMPLE_RATE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=150)
+    parser.add_argument("--new-clips", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ.setdefault("MLFLOW_TRACKING_URI", (tmp / "mlruns").as_uri())
+
+        from monitoring.traffic import TrafficLog
+        from training.retrain import check_live_drift, run_retraining_cycle
+        from training.train import load_saved_model
+
+        rng = np.random.default_rng(0)
+        data_dir, model_dir, cache_dir, log_dir = (
+            tmp / "data", tmp / "models", tmp / "cache", tmp / "logs"
+        )
+        write_clips(data_dir, args.clips, rng)
+
+        initial = run_retraining_cycle(str(data_dir), model_path=str(model_dir),
+                                       cache_dir=str(cache_dir))
+
+        # Live traffic whose features are shifted away from the training data.
+        _, label_encoder, schema = load_saved_model(str(model_dir))
+        reference = np.load(model_dir / "reference_features.npy")
+        traffic_log = TrafficLog(str(log_dir), schema, label_encoder.classes_)
+        for features in reference[rng.integers(0, len(reference), size=200)] * 1.5:
+            traffic_log.append(features, 0, 0.9)
+
+        start = time.perf_counter()
+        drift_detected, drift_score, _ = check_live_drift(str(model_dir), str(log_dir))
+        drift_seconds = time.perf_counter() - start
+
+        write_clips(data_dir, args.new_clips, rng, start=args.clips)
+        incremental = run_retraining_cycle(str(data_dir), model_path=str(model_dir),
+                                           cache_dir=str(cache_dir))
+        unchanged = run_retraining_cycle(str(data_dir), model_path=str(model_dir),
+                                         cache_dir=str(cache_dir))
+
+        print(f"drift check: detected={drift_detected} score={drift_score:.2f} "
+              f"in {drift_seconds:.2f}s")
+        print(f"{'cycle':<12} {'new':>5} {'cached':>7} {'featurize s':>12} "
+              f"{'train s':>8} {'total s':>8} {'promoted':>9}")
+        for name, cycle in [("cold", initial), ("incremental", incremental),
+                            ("no new data", unchanged)]:
+            t = cycle["timings"]
+            print(f"{name:<12} {cycle['new_files']:>5} {cycle['cached_files']:>7} "
+                  f"{t['featurize']:>12.2f} {t['train']:>8.2f} {t['total']:>8.2f} "
+                  f"{str(cycle['promoted']):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark /predict throughput and per-worker memory across worker counts.
+
+Trains a throwaway forest on synthetic features, starts the API with
+API_WORKERS=1,2,4,... and reports requests/s plus each worker's private
+(unshared) memory, which should stay flat as the model grows.
+
+    python scripts/benchmark_serving.py --workers 1 2 4 --requests 200
+"""
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+import soundfile as sf
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def build_model(model_dir, n_estimators):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(5000, 15))
+    y = rng.choice(["Negative", "Neutral", "Positive"], size=5000)
+
+    le = LabelEncoder()
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
+    model.fit(X, le.fit_transform(y))
+
+    with open(model_dir / "model.pkl", "wb") as f:
+        pickle.dump(model, f)
+    with open(model_dir / "label_encoder.pkl", "wb") as f:
+        pickle.dump(le, f)
+
+    return (model_dir / "model.pkl").stat().st_size
+
+
+def private_memory_kb(pid):
+    """Private_Clean + Private_Dirty of a process, i.e. pages it does not share."""
+    total = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def worker_pids(pid):
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [int(p) for p in children] or [pid]
+
+
+def wait_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not become ready")
+
+
+def run(workers, model_dir, audio_path, n_requests, port):
+    env = dict(os.environ, API_WORKERS=str(workers), API_PORT=str(port),
+               MODEL_DIR=str(model_dir))
+    proc = subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "src" / "deployment" / "api.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    audio_bytes = audio_path.read_bytes()
+
+    def predict(_):
+        response = requests.post(
+            f"{base_url}/predict", files={"file": ("clip.wav", audio_bytes)}
+        )
+        return "sentiment" in response.json()
+
+    try:
+        wait_ready(base_url)
+        with ThreadPoolExecutor(max_workers=workers * 4) as pool:
+            list(pool.map(predict, range(workers * 4)))  # warm every worker
+            start = time.perf_counter()
+            ok = sum(pool.map(predict, range(n_requests)))
+            elapsed = time.perf_counter() - start
+        memory = [private_memory_kb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return ok / elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--n-estimators", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        model_size = build_model(tmp, args.n_estimators)
+        audio_path = tmp / "clip.wav"
+        sf.write(audio_path, np.random.randn(22050 * 3) * 0.1, 22050)
+
+        print(f"model.pkl: {model_size / 1e6:.1f} MB")
+        print(f"{'workers':>7} {'req/s':>8} {'private MB per worker':>24}")
+        for workers in args.workers:
+            throughput, memory = run(workers, tmp, audio_path, args.requests, args.port)
+            per_worker = ", ".join(f"{kb / 1024:.0f}" for kb in memory)
+            print(f"{workers:>7} {throughput:>8.1f} {per_worker:>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark silence trimming before feature extraction.
+
+Builds synthetic labelled clips (class-dependent harmonic tones of random
+length at a random offset, padded with a low noise floor, plus some fully
+silent clips) and compares feature extraction time, audio kept and random
+forest accuracy with and without silence gating.
+
+    python scripts/benchmark_vad.py --clips 300 --top-db 40
+
+Pass --data-dir (and --csv-file) to compare accuracy on a real dataset
+through AudioProcessor.prepare_data instead.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.audio_processor import AudioProcessor
+from data_processing.vad import trim_silence
+
+CLASSES = {"negative": 140.0, "neutral": 190.0, "positive": 250.0}
+
+
+def make_clips(n_clips, silent_share, rng, sample_rate=22050, duration=3):
+    n_samples = sample_rate * duration
+    t = np.arange(n_samples) / sample_rate
+    names = list(CLASSES)
+    clips, labels = [], []
+    for i in range(n_clips):
+        label = names[i % len(names)]
+        audio = rng.normal(scale=3e-4, size=n_samples)
+        if rng.random() >= silent_share:
+            f0 = CLASSES[label] * rng.uniform(0.9, 1.1)
+            length = int(rng.uniform(0.5, 1.5) * sample_rate)
+            start = rng.integers(0, n_samples - length)
+            tone = sum(np.sin(2 * np.pi * f0 * k * t[:length]) / k for k in range(1, 6))
+            audio[start:start + length] += 0.2 * tone * np.hanning(length)
+        clips.append(audio.astype(np.float32))
+        labels.append(label)
+    return clips, np.array(labels)
+
+
+def featurize(processor, clips, top_db):
+    start = time.perf_counter()
+    features, keep, kept_samples = [], [], 0
+    for i, audio in enumerate(clips):
+        if top_db is not None:
+            audio = trim_silence(audio, top_db)
+            if len(audio) == 0:
+                continue
+        kept_samples += len(audio)
+        features.append(processor.compute_features(audio))
+        keep.append(i)
+    ms_per_clip = (time.perf_counter() - start) / len(clips) * 1000
+    return np.array(features), np.array(keep), kept_samples, ms_per_clip
+
+
+def cv_accuracy(X, y):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import cross_val_score
+
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
+    return cross_val_score(model, X, y, cv=5).mean()
+
+
+def benchmark_synthetic(args):
+    rng = np.random.default_rng(0)
+    clips, labels = make_clips(args.clips, args.silent_share, rng)
+    total_samples = sum(len(audio) for audio in clips)
+    processor = AudioProcessor()
+    processor.warm_up()
+
+    print(f"{args.clips} clips, {int(args.silent_share * 100)}% fully silent")
+    runs = {
+        name: featurize(processor, clips, top_db)
+        for name, top_db in (("no vad", None), (f"vad {args.top_db:g}dB", args.top_db))
+    }
+    # Silent clips get a cheap "silent" response, so accuracy is compared on
+    # the clips that still reach the model with gating on.
+    voiced = list(runs.values())[-1][1]
+
+    print(f"{'mode':<12} {'ms/clip':>9} {'audio kept':>11} {'scored':>7} {'accuracy':>9}")
+    for name, (X, keep, kept_samples, ms_per_clip) in runs.items():
+        accuracy = cv_accuracy(X[np.isin(keep, voiced)], labels[voiced])
+        print(f"{name:<12} {ms_per_clip:>9.2f} {kept_samples / total_samples:>10.1%} "
+              f"{len(keep):>7} {accuracy:>9.4f}")
+
+
+def benchmark_dataset(args):
+    from sklearn.metrics import accuracy_score
+    from sklearn.ensemble import RandomForestClassifier
+
+    print(f"{'mode':<12} {'featurize s':>12} {'train':>6} {'test':>6} {'accuracy':>9}")
+    for name, top_db in (("no vad", None), (f"vad {args.top_db:g}dB", args.top_db)):
+        processor = AudioProcessor(vad_top_db=top_db)
+        start = time.perf_counter()
+        X_train, X_test, y_train, y_test, _ = processor.prepare_data(args.data_dir, args.csv_file)
+        seconds = time.perf_counter() - start
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
+        model.fit(X_train, y_train)
+        accuracy = accuracy_score(y_test, model.predict(X_test))
+        print(f"{name:<12} {seconds:>12.2f} {len(X_train):>6} {len(X_test):>6} {accuracy:>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=300)
+    parser.add_argument("--silent-share", type=float, default=0.1)
+    parser.add_argument("--top-db", type=float, default=40.0)
+    parser.add_argument("--data-dir")
+    parser.add_argument("--csv-file")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        benchmark_dataset(args)
+    else:
+        benchmark_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
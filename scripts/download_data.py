@@ -1,96 +1,106 @@
+"""Download and extract the audio sentiment dataset.
+
+The archive is fetched with resumable range requests (re-run to continue an
+interrupted download), verified against a SHA-256 checksum when one is
+given, and extracted in parallel into data/TRAIN/ and data/TRAIN.csv.
+
+    python scripts/download_data.py --sample-rate 22050
+
+Settings default to the environment: DATASET_URL, DATASET_SHA256, DATA_DIR,
+TARGET_SAMPLE_RATE, and KAGGLE_USERNAME / KAGGLE_KEY for the Kaggle API.
+"""
 import os
-import zipfile
-import subprocess
-import shutil
+import sys
+import argparse
 from pathlib import Path
 import logging
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.download import download_file, extract_archive
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DATASET_URL = "https://www.kaggle.com/api/v1/datasets/download/imsparsh/audio-speech-sentiment"
+DATASET_PAGE = "https://www.kaggle.com/datasets/imsparsh/audio-speech-sentiment"
 
-def download_kaggle_data():
-    """Download and extract audio sentiment dataset from Kaggle"""
-    
-    data_dir = Path("data")
-    data_dir.mkdir(exist_ok=True)
-    
-    zip_path = Path.home() / "Downloads" / "audio-speech-sentiment.zip"
-    
-    try:
-        # Download using Kaggle API
-        logger.info("Downloading dataset from Kaggle...")
-        cmd = [
-            "curl", "-L", "-o", str(zip_path),
-            "https://www.kaggle.com/api/v1/datasets/download/imsparsh/audio-speech-sentiment"
-        ]
-        subprocess.run(cmd, check=True)
-        
-        # Extract the dataset
-        logger.info("Extracting dataset...")
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(data_dir)
-        
-        # Clean up zip file
-        zip_path.unlink()
-        
-        logger.info("Dataset downloaded and extracted to data/")
-        
-    except subprocess.CalledProcessError:
-        logger.error("Failed to download dataset. Make sure you have Kaggle API access.")
-        logger.info("Alternative: Download manually from https://www.kaggle.com/datasets/imsparsh/audio-speech-sentiment")
-        create_sample_structure()
-    except Exception as e:
-        logger.error(f"Error: {e}")
-        create_sample_structure()
-
-
-def create_sample_structure():
-    """Create sample directory structure matching Kaggle format"""
-    
-    data_dir = Path("data")
-    train_dir = data_dir / "TRAIN"
-    train_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create sample CSV file
-    csv_file = data_dir / "TRAIN.csv"
-    with open(csv_file, "w") as f:
-        f.write("Filename,Class\n")
-        f.write("# Download actual dataset from:\n")
-        f.write("# https://www.kaggle.com/datasets/imsparsh/audio-speech-sentiment\n")
-    
-    readme_file = train_dir / "README.txt"
-    with open(readme_file, "w") as f:
-        f.write("Audio files (.wav) should be placed in this directory\n")
-        f.write("Labels are in ../TRAIN.csv with format: Filename,Class\n")
-        f.write("Download from: https://www.kaggle.com/datasets/imsparsh/audio-speech-sentiment\n")
-    
-
-def create_dummy_audio_files():
+
+def download_dataset(url=DATASET_URL, data_dir="data", sha256=None, sample_rate=None,
+                     workers=None, keep_archive=False):
+    """Download, verify and extract the dataset archive into data_dir."""
+    data_dir = Path(data_dir)
+    archive_path = data_dir / "audio-speech-sentiment.zip"
+
+    auth = None
+    if os.environ.get("KAGGLE_USERNAME") and os.environ.get("KAGGLE_KEY"):
+        auth = (os.environ["KAGGLE_USERNAME"], os.environ["KAGGLE_KEY"])
+
+    logger.info(f"Downloading dataset from {url}...")
+    download_file(url, str(archive_path), sha256=sha256, auth=auth)
+
+    logger.info("Extracting dataset...")
+    extract_archive(str(archive_path), str(data_dir), sample_rate=sample_rate, workers=workers)
+
+    if not keep_archive:
+        archive_path.unlink()
+    logger.info(f"Dataset ready in {data_dir}/")
+
+
+def create_dummy_audio_files(data_dir="data"):
     """Create dummy audio files for testing purposes in correct format"""
     try:
         import numpy as np
         import soundfile as sf
-        
+
         # Create dummy files in the correct TRAIN directory
-        train_dir = Path("data/TRAIN")
+        train_dir = Path(data_dir) / "TRAIN"
         train_dir.mkdir(parents=True, exist_ok=True)
-        
+
         # Create a few dummy audio files
         sample_rate = 22050
         duration = 3
-        
+
         for i in range(3):
             # Generate random audio data
             audio_data = np.random.randn(sample_rate * duration) * 0.1
             filename = train_dir / f"{i+1}.wav"
             sf.write(filename, audio_data, sample_rate)
-        
+
         logger.info("Dummy audio files created for testing")
     except ImportError:
         logger.warning("numpy/soundfile not installed, skipping dummy audio creation")
 
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.environ.get("DATASET_URL", DATASET_URL))
+    parser.add_argument("--sha256", default=os.environ.get("DATASET_SHA256"))
+    parser.add_argument("--data-dir", default=os.environ.get("DATA_DIR", "data"))
+    parser.add_argument("--sample-rate", type=int,
+                        default=int(os.environ["TARGET_SAMPLE_RATE"])
+                        if os.environ.get("TARGET_SAMPLE_RATE") else None,
+                        help="resample WAVs to this rate while extracting")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--keep-archive", action="store_true")
+    parser.add_argument("--dummy", action="store_true",
+                        help="write three random clips instead of downloading")
+    args = parser.parse_args()
+
+    if args.dummy:
+        create_dummy_audio_files(args.data_dir)
+        return
+
+    try:
+        download_dataset(args.url, args.data_dir, sha256=args.sha256,
+                         sample_rate=args.sample_rate, workers=args.workers,
+                         keep_archive=args.keep_archive)
+    except Exception as e:
+        logger.error(f"Failed to download dataset: {e}")
+        logger.info("Re-run to resume the download, or set KAGGLE_USERNAME/KAGGLE_KEY for Kaggle API access.")
+        logger.info(f"Alternative: Download manually from {DATASET_PAGE}")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    download_kaggle_data()
-    create_dummy_audio_files()
+    main()
@@ -1,43 +1,155 @@
 import os
-import pandas as pd
-import librosa
+import hashlib
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import logging
 
+from data_processing.features import (
+    SpectralFrames, audio_fingerprint, build_schema, check_schema,
+    compute_feature_vector, resolve_feature_sets
+)
+from data_processing.dedup import file_digest
+from data_processing.vad import trim_silence
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def holdout_score(key):
+    """Stable value in [0, 1) for a dataset-relative path; below test_size is held out.
+
+    Keyed on the path alone, a file never changes sides as the corpus grows,
+    so successive retraining cycles share one held-out set that none of
+    their models trained on.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
 class AudioProcessor:
-    def __init__(self, sample_rate=22050, duration=3):
+    def __init__(self, sample_rate=22050, duration=3, feature_sets="basic",
+                 feature_dtype="float64", vad_top_db=None):
         self.sample_rate = sample_rate
         self.duration = duration
+        # When set, frames more than vad_top_db below the loudest one are
+        # dropped before feature extraction (see data_processing.vad).
+        self.vad_top_db = vad_top_db
+        # Storage precision for process_dataset output; features are always
+        # computed in float64, so this does not affect the schema.
+        self.feature_dtype = np.dtype(feature_dtype)
+        self.feature_sets = resolve_feature_sets(feature_sets)
+        self.schema = build_schema(self.feature_sets, sample_rate, duration, vad_top_db)
+
+    @classmethod
+    def from_schema(cls, schema):
+        """Rebuild a processor from a saved schema, rejecting stale versions."""
+        processor = cls(
+            sample_rate=schema["sample_rate"],
+            duration=schema["duration"],
+            feature_sets=schema["feature_sets"],
+            vad_top_db=schema.get("vad_top_db"),
+        )
+        check_schema(schema, processor.schema)
+        return processor
+
+    def load_audio(self, file_path):
+        # librosa pulls in numba/scipy and dominates import time, so it is
+        # only loaded the first time audio is actually decoded.
+        import librosa
+
+        audio, _ = librosa.load(file_path, sr=self.sample_rate, duration=self.duration)
+        if self.vad_top_db is not None:
+            audio = trim_silence(audio, self.vad_top_db)
+        return audio
+
+    def compute_features(self, audio):
+        frames = SpectralFrames(audio, self.sample_rate)
+        return compute_feature_vector(frames, self.feature_sets)
 
     def extract_features(self, file_path):
         try:
-            audio, _ = librosa.load(file_path, sr=self.sample_rate, duration=self.duration)
-            
-            mfccs = librosa.feature.mfcc(y=audio, sr=self.sample_rate, n_mfcc=13)
-            mfccs_mean = np.mean(mfccs.T, axis=0)
-            
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio, sr=self.sample_rate)
-            spectral_centroid_mean = np.mean(spectral_centroid)
-            
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)
-            zcr_mean = np.mean(zero_crossing_rate)
-            
-            features = np.concatenate([mfccs_mean, [spectral_centroid_mean, zcr_mean]])
-            return features
+            audio = self.load_audio(file_path)
+            if len(audio) == 0:
+                logger.info(f"Skipping silent file: {file_path}")
+                return None
+            return self.compute_features(audio)
+        except Exception as e:
+            logger.error(f"Error processing {file_path}: {e}")
+            return None
+
+    def analyze(self, file_path):
+        """Features plus a duplicate-detection fingerprint from one decode and STFT."""
+        try:
+            audio = self.load_audio(file_path)
+            if len(audio) == 0:
+                logger.info(f"Skipping silent file: {file_path}")
+                return None, None
+            frames = SpectralFrames(audio, self.sample_rate)
+            features = compute_feature_vector(frames, self.feature_sets)
+            return features, audio_fingerprint(frames)
         except Exception as e:
             logger.error(f"Error processing {file_path}: {e}")
+            return None, None
+
+    def warm_up(self):
+        """Import librosa and JIT-compile its numba kernels on a short signal."""
+        audio = np.zeros(self.sample_rate // 2, dtype=np.float32)
+        audio[::100] = 1.0
+        self.compute_features(audio)
+
+    def _cached_features(self, file_path, cache):
+        if cache is None:
+            return self.extract_features(file_path)
+
+        feature = cache.get(file_path)
+        if feature is None:
+            feature = self.extract_features(file_path)
+            if feature is not None:
+                cache.put(file_path, feature)
+        return feature
+
+    def _cached_analysis(self, file_path, cache):
+        if cache is not None:
+            entry = cache.get(file_path, with_fingerprint=True)
+            if entry is not None:
+                return entry
+
+        feature, fingerprint = self.analyze(file_path)
+        if cache is not None and feature is not None:
+            cache.put(file_path, feature, fingerprint)
+        return feature, fingerprint
+
+    def _load_sample(self, file_path, cache, dedup):
+        if dedup is None:
+            return self._cached_features(file_path, cache)
+
+        # Exact duplicates are skipped from their bytes, before decoding. The
+        # digest is cached alongside the features, so warm passes do not
+        # re-read and re-hash every file.
+        cached_digest = cache.get_digest(file_path) if cache is not None else None
+        digest = cached_digest or file_digest(file_path)
+        if dedup.check_file(file_path, digest) is not None:
             return None
 
-    def process_dataset(self, data_dir, csv_file=None):
+        feature, fingerprint = self._cached_analysis(file_path, cache)
+        if feature is not None:
+            dedup.add(file_path, fingerprint)
+            if cache is not None and cached_digest is None:
+                cache.put_digest(file_path, digest)
+        return feature
+
+    def process_dataset(self, data_dir, csv_file=None, cache=None, dedup=None,
+                        return_keys=False, dtype=None):
+        """Features and labels; with return_keys also each sample's relative path.
+
+        Features are returned as feature_dtype unless dtype overrides it.
+        """
         features = []
         labels = []
+        keys = []
         
+        if cache is not None:
+            check_schema(self.schema, cache.schema)
+
         if csv_file and os.path.exists(csv_file):
             # Use CSV file for labels (Kaggle dataset format)
             import pandas as pd
@@ -49,10 +161,11 @@ class AudioProcessor:
                 file_path = os.path.join(data_dir, filename)
                 
                 if os.path.exists(file_path):
-                    feature = self.extract_features(file_path)
+                    feature = self._load_sample(file_path, cache, dedup)
                     if feature is not None:
                         features.append(feature)
                         labels.append(label)
+                        keys.append(str(filename))
                 else:
                     logger.warning(f"Audio file not found: {file_path}")
         else:
@@ -65,16 +178,113 @@ class AudioProcessor:
                 for audio_file in os.listdir(emotion_path):
                     if audio_file.endswith('.wav'):
                         file_path = os.path.join(emotion_path, audio_file)
-                        feature = self.extract_features(file_path)
+                        feature = self._load_sample(file_path, cache, dedup)
                         
                         if feature is not None:
                             features.append(feature)
                             labels.append(emotion_dir)
+                            keys.append(f"{emotion_dir}/{audio_file}")
         
-        return np.array(features), np.array(labels)
+        if cache is not None:
+            logger.info(f"Feature cache: {cache.hits} cached, {cache.misses} extracted")
+        if dedup is not None and dedup.exact_duplicates:
+            logger.warning(
+                f"Skipped {len(dedup.exact_duplicates)} exact duplicate files"
+            )
 
-    def prepare_data(self, data_dir, csv_file=None, test_size=0.3):
-        X, y = self.process_dataset(data_dir, csv_file)
+        X = np.array(features, dtype=dtype or self.feature_dtype)
+        y = np.array(labels)
+        if return_keys:
+            return X, y, keys
+        return X, y
+
+    def _split(self, X, y_encoded, test_size):
+        from sklearn.model_selection import train_test_split
+
+        # Check if we have enough data for stratified split
+        unique_classes, class_counts = np.unique(y_encoded, return_counts=True)
+        min_class_count = min(class_counts)
+
+        if min_class_count < 2:
+            logger.warning(
+                "Not enough samples per class for stratified split, using random split"
+            )
+            return train_test_split(X, y_encoded, test_size=test_size, random_state=42)
+
+        # Adjust test_size if needed to ensure at least 1 sample per class in test set
+        min_test_size = len(unique_classes) / len(X)
+        actual_test_size = max(test_size, min_test_size)
+
+        return train_test_split(
+            X, y_encoded, test_size=actual_test_size, random_state=42,
+            stratify=y_encoded,
+        )
+
+    def _near_duplicate_groups(self, y, dedup):
+        pairs = dedup.near_duplicate_pairs()
+        groups = dedup.near_duplicate_groups(pairs)
+
+        conflicts = int(np.sum(y[pairs[:, 0]] != y[pairs[:, 1]]))
+        merged = len(y) - len(np.unique(groups))
+        logger.info(f"Near duplicates: {len(pairs)} pairs in {merged} merged clips")
+        if conflicts:
+            logger.warning(f"{conflicts} near-duplicate pairs have different labels")
+        return groups
+
+    def _group_split(self, X, y, y_encoded, test_size, dedup):
+        """Split whole near-duplicate groups so no group straddles train and test."""
+        groups = self._near_duplicate_groups(y, dedup)
+        _, first, group_of_sample = np.unique(
+            groups, return_index=True, return_inverse=True
+        )
+        train_groups, test_groups, _, _ = self._split(
+            np.arange(len(first)), y_encoded[first], test_size
+        )
+        train_idx = np.flatnonzero(np.isin(group_of_sample, train_groups))
+        test_idx = np.flatnonzero(np.isin(group_of_sample, test_groups))
+
+        return X[train_idx], X[test_idx], y_encoded[train_idx], y_encoded[test_idx]
+
+    def _stable_split(self, X, y, y_encoded, keys, ages, test_size, dedup):
+        """Hold out files by a hash of their path, the same ones on every run.
+
+        A near-duplicate group follows its oldest member (by ages, then
+        key), so clips that join it later never move it across the split.
+        """
+        # Path-keyed rather than random, so every training run holds out the
+        # same files and retraining can compare models on unseen data.
+        scores = np.array([holdout_score(key) for key in keys])
+        if dedup is not None:
+            groups = self._near_duplicate_groups(y, dedup)
+            group_scores = {}
+            for i in sorted(range(len(keys)), key=lambda i: (ages[i], keys[i])):
+                group_scores.setdefault(groups[i], scores[i])
+            scores = np.array([group_scores[group] for group in groups])
+
+        test_mask = scores < test_size
+        if test_mask.all() or not test_mask.any():
+            raise ValueError(
+                f"Held-out split is degenerate: {int(test_mask.sum())} of "
+                f"{len(test_mask)} samples held out"
+            )
+        return X[~test_mask], X[test_mask], y_encoded[~test_mask], y_encoded[test_mask]
+
+    def prepare_data(self, data_dir, csv_file=None, test_size=0.3, cache=None,
+                     dedup=None, full_precision_test=False, stable_holdout=False):
+        """Split the dataset; X_train is feature_dtype.
+
+        The split is stratified by class unless stable_holdout is set, which
+        holds out the same files on every run (see _stable_split) for
+        comparing successive models. X_test is feature_dtype too, or float64
+        with full_precision_test, so a reduced-precision model can be
+        compared against the full path.
+        """
+        from sklearn.preprocessing import LabelEncoder
+
+        X, y, keys = self.process_dataset(
+            data_dir, csv_file, cache=cache, dedup=dedup, return_keys=True,
+            dtype=np.float64 if full_precision_test else None,
+        )
         
         if len(X) == 0:
             raise ValueError("No audio data found")
@@ -82,23 +292,26 @@ class AudioProcessor:
         le = LabelEncoder()
         y_encoded = le.fit_transform(y)
         
-        # Check if we have enough data for stratified split
-        unique_classes, class_counts = np.unique(y_encoded, return_counts=True)
-        min_class_count = min(class_counts)
-        
-        if min_class_count < 2:
-            logger.warning("Not enough samples per class for stratified split, using random split")
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y_encoded, test_size=test_size, random_state=42
+        if stable_holdout:
+            ages = [os.path.getmtime(os.path.join(data_dir, key)) for key in keys]
+            X_train, X_test, y_train, y_test = self._stable_split(
+                X, y, y_encoded, keys, ages, test_size, dedup
             )
+        elif dedup is None:
+            X_train, X_test, y_train, y_test = self._split(X, y_encoded, test_size)
         else:
-            # Adjust test_size if needed to ensure at least 1 sample per class in test set
-            min_test_size = len(unique_classes) / len(X)
-            actual_test_size = max(test_size, min_test_size)
-            
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y_encoded, test_size=actual_test_size, random_state=42, stratify=y_encoded
+            X_train, X_test, y_train, y_test = self._group_split(
+                X, y, y_encoded, test_size, dedup
             )
+        X_train = X_train.astype(self.feature_dtype, copy=False)
+
+        for side, labels in (("training", y_train), ("test", y_test)):
+            missing = np.setdiff1d(np.arange(len(le.classes_)), labels)
+            if len(missing):
+                logger.warning(
+                    f"Classes missing from the {side} split: "
+                    f"{', '.join(str(c) for c in le.classes_[missing])}"
+                )
         
         logger.info(f"Data split: {len(X_train)} training, {len(X_test)} testing samples")
         logger.info(f"Classes: {le.classes_}")
@@ -0,0 +1,159 @@
+import hashlib
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DuplicateIndex:
+    """Exact content hashes plus approximate near-duplicate search over fingerprints.
+
+    Exact duplicates are caught from the file bytes before anything is
+    decoded. Near duplicates (re-encodes, gain changes, small trims) are
+    found by cosine similarity of the int8 fingerprints from
+    data_processing.features.audio_fingerprint: brute force for small
+    corpora, random-hyperplane LSH above brute_force_limit.
+
+    Copies of one clip form small cliques. Clips that match many others sit
+    in a dense region of similar but distinct recordings (e.g. steady tones),
+    which the coarse fingerprint cannot tell apart, so such matches and any
+    group larger than max_group_size are not treated as duplicates.
+
+    Use one index per dataset pass; fingerprints are kept in sample order.
+    """
+
+    def __init__(self, threshold=0.98, max_group_size=8, n_tables=12, n_bits=None,
+                 max_bucket_scan=64, brute_force_limit=5000, seed=0):
+        self.threshold = threshold
+        self.max_group_size = max_group_size
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.max_bucket_scan = max_bucket_scan
+        self.brute_force_limit = brute_force_limit
+        self.seed = seed
+
+        self.digests = {}
+        self.exact_duplicates = []
+        self.paths = []
+        self.fingerprints = []
+
+    def check_file(self, file_path, digest=None):
+        """Return the path this file exactly duplicates, or None (and remember it).
+
+        Pass a digest already known for the file to skip reading it.
+        """
+        if digest is None:
+            digest = file_digest(file_path)
+        original = self.digests.get(digest)
+        if original is not None:
+            self.exact_duplicates.append((file_path, original))
+            return original
+        self.digests[digest] = file_path
+        return None
+
+    def add(self, file_path, fingerprint):
+        self.paths.append(file_path)
+        self.fingerprints.append(np.asarray(fingerprint, dtype=np.int8))
+
+    def _unit_vectors(self):
+        F = np.asarray(self.fingerprints, dtype=np.float32)
+        norms = np.linalg.norm(F, axis=1, keepdims=True)
+        return np.divide(F, norms, out=np.zeros_like(F), where=norms > 0)
+
+    def _brute_force_pairs(self, F, chunk_size=2048):
+        pairs = []
+        for start in range(0, len(F), chunk_size):
+            similarity = F[start:start + chunk_size] @ F.T
+            rows, cols = np.nonzero(similarity >= self.threshold)
+            rows += start
+            keep = rows < cols
+            pairs.append(np.stack([rows[keep], cols[keep]], axis=1))
+        return np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+
+    def _lsh_pairs(self, F):
+        # Hash the corpus-centred vectors: raw fingerprints share a common
+        # spectral tilt, which would otherwise put most clips in one bucket.
+        centred = F - F.mean(axis=0)
+        rng = np.random.default_rng(self.seed)
+        # Enough bits that unrelated clips rarely share a bucket: expected
+        # random collisions per table stay below n / 16.
+        n_bits = self.n_bits or max(12, int(np.ceil(np.log2(len(F)))) + 4)
+        planes = rng.normal(size=(F.shape[1], self.n_tables * n_bits))
+        planes = planes.astype(np.float32)
+        bits = (centred @ planes > 0).reshape(len(F), self.n_tables, n_bits)
+        codes = bits.astype(np.int64) @ (1 << np.arange(n_bits, dtype=np.int64))
+
+        candidates = []
+        for table in range(self.n_tables):
+            order = np.argsort(codes[:, table], kind="stable")
+            sorted_codes = codes[order, table]
+            # Members of a bucket are contiguous after sorting; pair each one
+            # with the next max_bucket_scan members of the same bucket.
+            for offset in range(1, min(self.max_bucket_scan, len(F) - 1) + 1):
+                same = np.nonzero(sorted_codes[:-offset] == sorted_codes[offset:])[0]
+                if len(same) == 0:
+                    break
+                candidates.append(np.stack([order[same], order[same + offset]], axis=1))
+
+        if not candidates:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = np.unique(np.sort(np.concatenate(candidates), axis=1), axis=0)
+        similarity = np.concatenate([
+            np.einsum("ij,ij->i", F[chunk[:, 0]], F[chunk[:, 1]])
+            for chunk in np.array_split(pairs, max(1, len(pairs) // 1000000))
+        ])
+        return pairs[similarity >= self.threshold]
+
+    def _drop_dense_pairs(self, pairs):
+        degree = np.bincount(pairs.ravel(), minlength=len(self.fingerprints))
+        dense = degree >= self.max_group_size
+        if dense.any():
+            logger.warning(
+                f"{int(dense.sum())} clips each match {self.max_group_size} or more "
+                f"others; treating them as distinct, not near duplicates"
+            )
+        return pairs[~(dense[pairs[:, 0]] | dense[pairs[:, 1]])]
+
+    def near_duplicate_pairs(self):
+        """(i, j) sample index pairs, i < j, whose fingerprints are near-identical."""
+        if len(self.fingerprints) < 2:
+            return np.zeros((0, 2), dtype=np.int64)
+        F = self._unit_vectors()
+        if len(F) <= self.brute_force_limit:
+            pairs = self._brute_force_pairs(F)
+        else:
+            pairs = self._lsh_pairs(F)
+        return self._drop_dense_pairs(pairs)
+
+    def near_duplicate_groups(self, pairs=None):
+        """Connected-component id per sample; near duplicates share an id."""
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        n = len(self.fingerprints)
+        if pairs is None:
+            pairs = self.near_duplicate_pairs()
+        edges = (pairs[:, 0], pairs[:, 1])
+        graph = coo_matrix((np.ones(len(pairs)), edges), shape=(n, n))
+        _, groups = connected_components(graph, directed=False)
+
+        # Chains of pairwise matches can still link distinct clips into one
+        # large component; split those back into singletons.
+        oversized = np.bincount(groups)[groups] > self.max_group_size
+        if oversized.any():
+            logger.warning(
+                f"{int(oversized.sum())} clips are in near-duplicate groups larger "
+                f"than {self.max_group_size}; treating them as distinct"
+            )
+            groups = groups.copy()
+            groups[oversized] = groups.max() + 1 + np.arange(int(oversized.sum()))
+        return groups
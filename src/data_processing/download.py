@@ -0,0 +1,261 @@
+import os
+import io
+import time
+import zipfile
+import hashlib
+import threading
+import posixpath
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# Bytes in a chunk that is being read when a connection drops are lost, so
+# keep download chunks small to lose little progress.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def sha256_file(file_path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_file(url, dest, sha256=None, auth=None, retries=3, timeout=60,
+                  chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Download url to dest, resuming from dest + ".part" with a Range request.
+
+    The partial file survives interruptions, so re-running picks up where
+    the last attempt stopped. A completed dest whose checksum matches is
+    not fetched again. Raises ValueError if the finished file is truncated
+    or does not match sha256; the partial file is removed in that case.
+    """
+    import requests
+
+    if os.path.exists(dest) and sha256 and sha256_file(dest) == sha256.lower():
+        logger.info(f"{dest} already downloaded and verified")
+        return dest
+
+    part_path = dest + ".part"
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+
+    for attempt in range(retries + 1):
+        try:
+            total = _fetch(url, part_path, auth, timeout, chunk_size)
+            break
+        except requests.HTTPError:
+            raise
+        except (requests.RequestException, IOError) as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"Download interrupted ({e}), retrying")
+            time.sleep(min(2 ** attempt, 30))
+
+    size = os.path.getsize(part_path)
+    if total is not None and size != total:
+        os.remove(part_path)
+        raise ValueError(f"Downloaded {size} bytes from {url}, expected {total}")
+
+    digest = sha256_file(part_path)
+    if sha256 and digest != sha256.lower():
+        os.remove(part_path)
+        raise ValueError(
+            f"Checksum mismatch for {url}: expected {sha256}, got {digest}"
+        )
+    if not sha256:
+        logger.info(f"No checksum given; downloaded sha256 is {digest}")
+
+    os.replace(part_path, dest)
+    return dest
+
+
+def _fetch(url, part_path, auth, timeout, chunk_size):
+    """Append the rest of url to part_path; returns the full size if known."""
+    import requests
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with requests.get(url, headers=headers, auth=auth, stream=True,
+                      timeout=timeout) as response:
+        if offset and response.status_code == 416:
+            # Nothing left to fetch: fine if the partial file is exactly the
+            # remote size, otherwise it is stale (e.g. from a larger, older
+            # version of the file) and the download starts over.
+            total = _unsatisfied_total(response)
+            if total == offset:
+                return offset
+            logger.warning(
+                f"Partial download of {url} is {offset} bytes but the file has "
+                f"{total if total is not None else 'an unknown number of'} bytes, "
+                f"restarting"
+            )
+            response.close()
+            os.remove(part_path)
+            return _fetch(url, part_path, auth, timeout, chunk_size)
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            logger.warning("Server ignored the range request, restarting download")
+            offset = 0
+        elif offset:
+            logger.info(f"Resuming {url} at {offset} bytes")
+        total = _total_size(response, offset)
+
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if total is not None and size < total:
+        raise IOError(f"Connection closed at {size} of {total} bytes")
+    return total
+
+
+def _unsatisfied_total(response):
+    """Full size from a 416 response's "Content-Range: bytes */N", if present."""
+    content_range = response.headers.get("Content-Range", "")
+    if not content_range.startswith("bytes */"):
+        return None
+    total = content_range[len("bytes */"):]
+    return int(total) if total.isdigit() else None
+
+
+def _total_size(response, offset):
+    content_range = response.headers.get("Content-Range")
+    if response.status_code == 206 and content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    if length is None:
+        return None
+    return int(length) + (offset if response.status_code == 206 else 0)
+
+
+def archive_layout(names):
+    """Map archive member names to paths relative to the data directory.
+
+    A single wrapping top-level directory (e.g. "dataset/TRAIN/1.wav") is
+    stripped, so the archive's TRAIN/ and TRAIN.csv land directly in the
+    data directory as AudioProcessor.process_dataset expects. An archive
+    holding only TRAIN/ already has that layout and is kept as is.
+    Directory entries are skipped and members that would escape the data
+    directory raise ValueError.
+    """
+    files = [name for name in names if not name.endswith("/")]
+    tops = {name.split("/", 1)[0] for name in files}
+    wrapped = (len(tops) == 1 and tops != {"TRAIN"}
+               and all("/" in name for name in files))
+
+    layout = {}
+    for name in files:
+        relative = posixpath.normpath(name.split("/", 1)[1] if wrapped else name)
+        if relative.startswith("../") or relative == ".." or posixpath.isabs(relative):
+            raise ValueError(f"Archive member escapes the data directory: {name}")
+        layout[name] = relative
+    return layout
+
+
+class _ArchiveReader(threading.local):
+    """One ZipFile handle per thread, so members decompress in parallel.
+
+    Every handle opened is appended to handles, so the caller can close
+    them all once the worker threads are done.
+    """
+
+    def __init__(self, archive_path, handles, lock):
+        self.archive = zipfile.ZipFile(archive_path)
+        with lock:
+            handles.append(self.archive)
+
+
+def extract_archive(archive_path, data_dir, sample_rate=None, workers=None):
+    """Extract archive_path into data_dir with parallel streams.
+
+    With sample_rate set, WAV files are resampled to it on the way out, so
+    AudioProcessor.load_audio never has to. Each file is written to a
+    temporary name and renamed, so an interrupted extraction never leaves a
+    truncated file behind, and files already extracted are skipped on a
+    re-run. zipfile checks each member's CRC as it is read.
+
+    Returns (extracted, skipped) file counts.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        members = {info.filename: info for info in archive.infolist()}
+    layout = archive_layout(members)
+    handles = []
+    reader = _ArchiveReader(archive_path, handles, threading.Lock())
+
+    def extract(name):
+        info = members[name]
+        target = os.path.join(data_dir, *layout[name].split("/"))
+        convert = sample_rate is not None and name.lower().endswith(".wav")
+        if _is_extracted(target, info, sample_rate if convert else None):
+            return False
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{threading.get_ident()}.tmp"
+        try:
+            with reader.archive.open(info) as source:
+                if convert:
+                    _write_resampled(source.read(), tmp_path, sample_rate)
+                else:
+                    with open(tmp_path, "wb") as dest:
+                        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                            dest.write(chunk)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return True
+
+    start = time.perf_counter()
+    # Largest members first, so one big file does not finish last alone.
+    order = sorted(layout, key=lambda name: members[name].file_size, reverse=True)
+    workers = workers or min(8, os.cpu_count() or 1)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract, order))
+    finally:
+        for archive in handles:
+            archive.close()
+
+    extracted = sum(results)
+    logger.info(
+        f"Extracted {extracted} files ({len(results) - extracted} already present) "
+        f"to {data_dir} in {time.perf_counter() - start:.1f}s"
+    )
+    return extracted, len(results) - extracted
+
+
+def _is_extracted(target, info, sample_rate):
+    if not os.path.exists(target):
+        return False
+    if sample_rate is None:
+        return os.path.getsize(target) == info.file_size
+    import soundfile as sf
+
+    try:
+        return sf.info(target).samplerate == sample_rate
+    except RuntimeError:
+        return False
+
+
+def _write_resampled(data, dest_path, sample_rate):
+    import soundfile as sf
+
+    with sf.SoundFile(io.BytesIO(data)) as source:
+        subtype = source.subtype
+        source_rate = source.samplerate
+        audio = source.read(always_2d=True)
+    if source_rate != sample_rate:
+        import librosa
+
+        audio = librosa.resample(audio.T, orig_sr=source_rate, target_sr=sample_rate).T
+        if subtype.startswith("PCM"):
+            # Resampling can overshoot full scale slightly; integer formats would wrap.
+            audio = np.clip(audio, -1.0, 1.0)
+    sf.write(dest_path, audio, sample_rate, subtype=subtype, format="WAV")
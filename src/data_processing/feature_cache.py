@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """SQLite cache of per-file feature vectors for a single feature schema.
+
+    Entries are keyed on path, size and mtime, so edited or replaced files
+    are re-featurized, and the database name carries the schema id, so a
+    schema change starts from an empty cache instead of mixing vectors.
+    Entries can also hold the file's content digest for exact-duplicate
+    checks.
+    """
+
+    def __init__(self, cache_dir, schema):
+        self.schema = schema
+        self.path = os.path.join(cache_dir, f"features-{schema['schema_id']}.db")
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, fingerprint BLOB,"
+            " digest TEXT)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(features)")}
+        if "digest" not in columns:
+            self.conn.execute("ALTER TABLE features ADD COLUMN digest TEXT")
+
+    @staticmethod
+    def file_key(file_path):
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get(self, file_path, with_fingerprint=False):
+        """Cached features, or (features, fingerprint) when with_fingerprint is set.
+
+        Entries stored without a fingerprint count as misses for callers
+        that need one.
+        """
+        row = self.conn.execute(
+            "SELECT vector, fingerprint FROM features WHERE key = ?",
+            (self.file_key(file_path),),
+        ).fetchone()
+        if row is None or (with_fingerprint and row[1] is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        features = np.frombuffer(row[0], dtype=np.float64)
+        if with_fingerprint:
+            return features, np.frombuffer(row[1], dtype=np.int8)
+        return features
+
+    def put(self, file_path, features, fingerprint=None):
+        if fingerprint is not None:
+            fingerprint = np.asarray(fingerprint, dtype=np.int8).tobytes()
+        self.conn.execute(
+            "INSERT INTO features (key, vector, fingerprint) VALUES (?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET vector = excluded.vector,"
+            " fingerprint = COALESCE(excluded.fingerprint, features.fingerprint)",
+            (
+                self.file_key(file_path),
+                np.asarray(features, dtype=np.float64).tobytes(),
+                fingerprint,
+            ),
+        )
+
+    def get_digest(self, file_path):
+        """Cached content digest, or None. Does not count as a hit or miss."""
+        row = self.conn.execute(
+            "SELECT digest FROM features WHERE key = ?", (self.file_key(file_path),)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def put_digest(self, file_path, digest):
+        """Attach digest to the file's entry; files without an entry are ignored."""
+        self.conn.execute(
+            "UPDATE features SET digest = ? WHERE key = ?",
+            (digest, self.file_key(file_path)),
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,267 @@
+import json
+import hashlib
+import numpy as np
+
+# Bump whenever the computation behind an existing feature set changes, so
+# that cached features and models trained on the old values are rejected.
+FEATURE_SCHEMA_VERSION = 1
+
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MFCC = 13
+
+# Duplicate-detection fingerprint: a coarse log-mel profile limited to the
+# band that survives resampling and re-encoding.
+FINGERPRINT_BANDS = 16
+FINGERPRINT_SEGMENTS = 8
+FINGERPRINT_FMAX = 4000.0
+
+FEATURE_SETS = {}
+
+# Named combinations of feature sets. "basic" reproduces the original
+# 15-dimensional vector (13 MFCC means, centroid mean, ZCR mean).
+FEATURE_CONFIGS = {
+    "basic": ("mfcc_mean", "spectral_centroid", "zcr"),
+    "extended": (
+        "mfcc_mean", "spectral_centroid", "zcr",
+        "mfcc_std", "mfcc_delta", "chroma",
+        "spectral_rolloff", "spectral_bandwidth", "spectral_contrast",
+        "rms", "pooled_stats",
+    ),
+}
+
+
+class SpectralFrames:
+    """Per-clip cache so every feature set reuses a single STFT pass."""
+
+    def __init__(self, audio, sample_rate):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self._cache = {}
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def magnitude(self):
+        import librosa
+
+        return self._get("magnitude", lambda: np.abs(librosa.stft(
+            self.audio, n_fft=N_FFT, hop_length=HOP_LENGTH, pad_mode="constant"
+        )))
+
+    @property
+    def power(self):
+        return self._get("power", lambda: self.magnitude ** 2)
+
+    @property
+    def mfcc(self):
+        import librosa
+
+        def compute():
+            mel = librosa.feature.melspectrogram(S=self.power, sr=self.sample_rate)
+            return librosa.feature.mfcc(
+                S=librosa.power_to_db(mel), sr=self.sample_rate, n_mfcc=N_MFCC
+            )
+
+        return self._get("mfcc", compute)
+
+    @property
+    def centroid(self):
+        import librosa
+
+        return self._get("centroid", lambda: librosa.feature.spectral_centroid(
+            S=self.magnitude, sr=self.sample_rate
+        )[0])
+
+    @property
+    def zcr(self):
+        import librosa
+
+        return self._get("zcr", lambda: librosa.feature.zero_crossing_rate(
+            self.audio, frame_length=N_FFT, hop_length=HOP_LENGTH
+        )[0])
+
+    @property
+    def rms(self):
+        import librosa
+
+        return self._get("rms", lambda: librosa.feature.rms(
+            S=self.magnitude, frame_length=N_FFT, hop_length=HOP_LENGTH
+        )[0])
+
+
+def feature_set(name, size):
+    def register(func):
+        FEATURE_SETS[name] = (func, size)
+        return func
+    return register
+
+
+@feature_set("mfcc_mean", N_MFCC)
+def _mfcc_mean(frames):
+    return np.mean(frames.mfcc, axis=1)
+
+
+@feature_set("spectral_centroid", 1)
+def _spectral_centroid(frames):
+    return [np.mean(frames.centroid)]
+
+
+@feature_set("zcr", 1)
+def _zcr(frames):
+    return [np.mean(frames.zcr)]
+
+
+@feature_set("mfcc_std", N_MFCC)
+def _mfcc_std(frames):
+    return np.std(frames.mfcc, axis=1)
+
+
+@feature_set("mfcc_delta", N_MFCC)
+def _mfcc_delta(frames):
+    import librosa
+
+    # "nearest" keeps very short clips (fewer frames than the delta width) valid.
+    return np.mean(np.abs(librosa.feature.delta(frames.mfcc, mode="nearest")), axis=1)
+
+
+@feature_set("chroma", 12)
+def _chroma(frames):
+    import librosa
+
+    chroma = librosa.feature.chroma_stft(S=frames.power, sr=frames.sample_rate)
+    return np.mean(chroma, axis=1)
+
+
+@feature_set("spectral_rolloff", 1)
+def _spectral_rolloff(frames):
+    import librosa
+
+    rolloff = librosa.feature.spectral_rolloff(
+        S=frames.magnitude, sr=frames.sample_rate
+    )
+    return [np.mean(rolloff)]
+
+
+@feature_set("spectral_bandwidth", 1)
+def _spectral_bandwidth(frames):
+    import librosa
+
+    bandwidth = librosa.feature.spectral_bandwidth(
+        S=frames.magnitude, sr=frames.sample_rate
+    )
+    return [np.mean(bandwidth)]
+
+
+@feature_set("spectral_contrast", 7)
+def _spectral_contrast(frames):
+    import librosa
+
+    contrast = librosa.feature.spectral_contrast(
+        S=frames.magnitude, sr=frames.sample_rate
+    )
+    return np.mean(contrast, axis=1)
+
+
+@feature_set("rms", 1)
+def _rms(frames):
+    return [np.mean(frames.rms)]
+
+
+@feature_set("pooled_stats", 8)
+def _pooled_stats(frames):
+    """Spread of the frame-level centroid, ZCR and RMS tracks."""
+    rms = frames.rms
+    return [
+        np.std(frames.centroid), np.std(frames.zcr), np.std(rms),
+        np.min(rms), np.max(rms),
+        np.percentile(rms, 10), np.percentile(rms, 90),
+        np.max(frames.centroid) - np.min(frames.centroid),
+    ]
+
+
+def resolve_feature_sets(feature_sets):
+    """Accept a config name from FEATURE_CONFIGS or an explicit list of set names."""
+    if isinstance(feature_sets, str):
+        if feature_sets not in FEATURE_CONFIGS:
+            raise ValueError(f"Unknown feature config: {feature_sets}")
+        feature_sets = FEATURE_CONFIGS[feature_sets]
+
+    unknown = [name for name in feature_sets if name not in FEATURE_SETS]
+    if unknown:
+        raise ValueError(f"Unknown feature sets: {unknown}")
+    return tuple(feature_sets)
+
+
+def feature_names(feature_sets):
+    """Column names for a feature vector, e.g. mfcc_mean_0 ... zcr."""
+    names = []
+    for name in feature_sets:
+        size = FEATURE_SETS[name][1]
+        names.extend([name] if size == 1 else [f"{name}_{i}" for i in range(size)])
+    return names
+
+
+def compute_feature_vector(frames, feature_sets):
+    parts = []
+    for name in feature_sets:
+        func, size = FEATURE_SETS[name]
+        values = np.asarray(func(frames), dtype=np.float64)
+        assert values.shape == (size,), f"{name} produced {values.shape}"
+        parts.append(values)
+    return np.concatenate(parts)
+
+
+def audio_fingerprint(frames):
+    """Gain-invariant int8 fingerprint (bands x time segments) with unit norm * 127."""
+    import librosa
+
+    mel_basis = librosa.filters.mel(
+        sr=frames.sample_rate, n_fft=N_FFT, n_mels=FINGERPRINT_BANDS,
+        fmax=FINGERPRINT_FMAX,
+    )
+    log_mel = np.log(mel_basis @ frames.power + 1e-10)
+    segments = np.array_split(log_mel, FINGERPRINT_SEGMENTS, axis=1)
+    profile = np.stack([
+        segment.mean(axis=1) if segment.size else np.zeros(FINGERPRINT_BANDS)
+        for segment in segments
+    ], axis=1).ravel()
+
+    # Subtracting the mean log energy removes overall gain.
+    profile -= profile.mean()
+    norm = np.linalg.norm(profile)
+    if norm == 0:
+        return np.zeros(FINGERPRINT_BANDS * FINGERPRINT_SEGMENTS, dtype=np.int8)
+    return np.round(profile / norm * 127).astype(np.int8)
+
+
+def build_schema(feature_sets, sample_rate, duration, vad_top_db=None):
+    schema = {
+        "version": FEATURE_SCHEMA_VERSION,
+        "feature_sets": list(feature_sets),
+        "sizes": [FEATURE_SETS[name][1] for name in feature_sets],
+        "sample_rate": sample_rate,
+        "duration": duration,
+        "n_fft": N_FFT,
+        "hop_length": HOP_LENGTH,
+    }
+    # Only present when silence gating is on, so existing schema ids are unchanged.
+    if vad_top_db is not None:
+        schema["vad_top_db"] = vad_top_db
+    digest = hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:12]
+    schema["schema_id"] = f"v{FEATURE_SCHEMA_VERSION}-{digest}"
+    schema["n_features"] = sum(schema["sizes"])
+    return schema
+
+
+def check_schema(expected, actual):
+    """Raise ValueError if two feature schemas are not interchangeable."""
+    if expected["schema_id"] != actual["schema_id"]:
+        raise ValueError(
+            f"Feature schema mismatch: expected {expected['schema_id']} "
+            f"({', '.join(expected['feature_sets'])}), got {actual['schema_id']} "
+            f"({', '.join(actual['feature_sets'])})"
+        )
@@ -0,0 +1,35 @@
+import numpy as np
+
+FRAME_LENGTH = 512
+FLOOR_DB = -60.0
+HANGOVER_FRAMES = 2
+
+
+def voiced_frames(audio, top_db, frame_length=FRAME_LENGTH, floor_db=FLOOR_DB,
+                  hangover=HANGOVER_FRAMES):
+    """Boolean mask over non-overlapping frames that carry signal.
+
+    A frame is voiced when its energy is within top_db of the loudest frame
+    and above an absolute floor of floor_db dBFS; the mask is widened by
+    hangover frames on each side so word onsets and tails are kept.
+    """
+    n_frames = -(-len(audio) // frame_length)
+    padded = np.zeros(n_frames * frame_length, dtype=np.float32)
+    padded[:len(audio)] = audio
+    power = np.mean(padded.reshape(n_frames, frame_length) ** 2, axis=1)
+    energy_db = 10 * np.log10(power + 1e-12)
+
+    voiced = (energy_db > energy_db.max() - top_db) & (energy_db > floor_db)
+    if hangover and voiced.any():
+        voiced = np.convolve(voiced, np.ones(2 * hangover + 1), mode="same") > 0
+    return voiced
+
+
+def trim_silence(audio, top_db, frame_length=FRAME_LENGTH, floor_db=FLOOR_DB,
+                 hangover=HANGOVER_FRAMES):
+    """Drop silent frames; returns an empty array if the whole clip is silent."""
+    if len(audio) == 0:
+        return audio
+    voiced = voiced_frames(audio, top_db, frame_length, floor_db, hangover)
+    keep = np.repeat(voiced, frame_length)[:len(audio)]
+    return audio[keep]
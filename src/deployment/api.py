@@ -1,76 +1,263 @@
+import gc
+import os
+import sys
+import json
 import pickle
-import numpy as np
-from fastapi import FastAPI, UploadFile, File
-import librosa
+import random
+import signal
+import socket
+import tempfile
+import threading
+import time
+from fastapi import BackgroundTasks, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 import logging
 
+# Add src directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing.audio_processor import AudioProcessor
+from deployment.jobs import (
+    JobQueue, JobStore, MissingUpload, QueueFull, UploadTooLarge, check_content_length,
+    save_upload
+)
+from monitoring.traffic import TrafficLog
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Audio Sentiment API")
 
+MODEL_DIR = os.environ.get("MODEL_DIR", "models")
+JOB_DIR = os.environ.get("JOB_DIR", "jobs")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+MAX_QUEUE_DEPTH = int(os.environ.get("MAX_QUEUE_DEPTH", "100"))
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_JOB_WAIT_SECONDS = 30
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", "86400"))
+TRAFFIC_LOG_DIR = os.environ.get("TRAFFIC_LOG_DIR", "logs")
+TRAFFIC_SAMPLE_RATE = float(os.environ.get("TRAFFIC_SAMPLE_RATE", "0"))
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+# Uploads are streamed from the raw request instead of declared as
+# UploadFile (which Starlette spools in full before the handler runs), so
+# the multipart body is documented here for /docs.
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
 model = None
 label_encoder = None
+processor = AudioProcessor()
+job_queue = None
+traffic_log = None
+forked_worker = False
+
+# Set once the model is loaded and librosa/numba have been imported and
+# compiled, so the first real request does not pay the warm-up cost.
+ready = threading.Event()
 
 
 def load_model():
-    global model, label_encoder
+    global model, label_encoder, processor, traffic_log
     try:
-        with open("models/model.pkl", "rb") as f:
-            model = pickle.load(f)
-        with open("models/label_encoder.pkl", "rb") as f:
-            label_encoder = pickle.load(f)
-        logger.info("Model loaded successfully")
+        with open(os.path.join(MODEL_DIR, "model.pkl"), "rb") as f:
+            loaded_model = pickle.load(f)
+        with open(os.path.join(MODEL_DIR, "label_encoder.pkl"), "rb") as f:
+            loaded_encoder = pickle.load(f)
+
+        # Models saved before feature schemas existed were trained on "basic".
+        schema_path = os.path.join(MODEL_DIR, "feature_schema.json")
+        loaded_processor = AudioProcessor()
+        if os.path.exists(schema_path):
+            with open(schema_path) as f:
+                loaded_processor = AudioProcessor.from_schema(json.load(f))
+
+        n_features = getattr(loaded_model, "n_features_in_", None)
+        expected = loaded_processor.schema["n_features"]
+        if n_features is not None and n_features != expected:
+            raise ValueError(
+                f"Model expects {n_features} features but schema "
+                f"{loaded_processor.schema['schema_id']} produces "
+                f"{expected}"
+            )
+
+        model, label_encoder, processor = loaded_model, loaded_encoder, loaded_processor
+        logger.info(
+            f"Model loaded successfully (features {processor.schema['schema_id']})"
+        )
+
+        if TRAFFIC_SAMPLE_RATE > 0:
+            traffic_log = TrafficLog(
+                TRAFFIC_LOG_DIR, processor.schema, label_encoder.classes_
+            )
     except Exception as e:
         logger.error(f"Error loading model: {e}")
 
 
-@app.on_event("startup")
-async def startup_event():
+def warm_up():
     load_model()
+    try:
+        processor.warm_up()
+        logger.info("Feature extraction warmed up")
+    except Exception as e:
+        logger.error(f"Error warming up feature extraction: {e}")
+        return
+
+    if model is not None and label_encoder is not None:
+        ready.set()
 
 
-@app.post("/predict")
-async def predict_sentiment(file: UploadFile = File(...)):
+def score_file(audio_path):
+    """Return (response, features, class index) for one audio file."""
     if model is None or label_encoder is None:
-        return {"error": "Model not loaded"}
-    
+        raise RuntimeError("Model not loaded")
+
+    audio = processor.load_audio(audio_path)
+    if len(audio) == 0:
+        # Silence gating left nothing to classify; skip the model entirely.
+        return {"sentiment": None, "confidence": 0.0, "silent": True}, None, None
+    features = processor.compute_features(audio).reshape(1, -1)
+
+    proba = model.predict_proba(features)[0]
+    prediction = model.classes_[proba.argmax()]
+
+    sentiment = label_encoder.inverse_transform([prediction])[0]
+
+    result = {
+        "sentiment": sentiment,
+        "confidence": float(proba.max())
+    }
+    return result, features[0], prediction
+
+
+def log_traffic(features, prediction, confidence):
+    if features is None or traffic_log is None:
+        return
+    if random.random() >= TRAFFIC_SAMPLE_RATE:
+        return
     try:
-        audio_data = await file.read()
-        
-        with open("temp_audio.wav", "wb") as f:
-            f.write(audio_data)
-        
-        audio, _ = librosa.load("temp_audio.wav", sr=22050, duration=3)
-        
-        mfccs = librosa.feature.mfcc(y=audio, sr=22050, n_mfcc=13)
-        mfccs_mean = np.mean(mfccs.T, axis=0)
-        
-        spectral_centroid = librosa.feature.spectral_centroid(y=audio, sr=22050)
-        spectral_centroid_mean = np.mean(spectral_centroid)
-        
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)
-        zcr_mean = np.mean(zero_crossing_rate)
-        
-        features = np.concatenate([mfccs_mean, [spectral_centroid_mean, zcr_mean]])
-        features = features.reshape(1, -1)
-        
-        prediction = model.predict(features)[0]
-        probability = model.predict_proba(features)[0].max()
-        
-        sentiment = label_encoder.inverse_transform([prediction])[0]
-        
-        import os
-        os.remove("temp_audio.wav")
-        
-        return {
-            "sentiment": sentiment,
-            "confidence": float(probability)
-        }
-        
+        traffic_log.append(features, prediction, confidence)
+    except Exception as e:
+        logger.error(f"Error logging traffic sample: {e}")
+
+
+def predict_file(audio_path):
+    # Jobs already run off the request path, so they can log inline.
+    result, features, prediction = score_file(audio_path)
+    log_traffic(features, prediction, result["confidence"])
+    return result
+
+
+@app.on_event("startup")
+async def startup_event():
+    global job_queue
+    job_queue = JobQueue(
+        JobStore(os.path.join(JOB_DIR, "jobs.db")),
+        predict_file,
+        os.path.join(JOB_DIR, "uploads"),
+        workers=JOB_WORKERS,
+        max_depth=MAX_QUEUE_DEPTH,
+        retention_seconds=JOB_RETENTION_SECONDS,
+    )
+    # Forked workers share the job table with their siblings, so only a
+    # standalone process may treat "running" rows as abandoned. Under
+    # serve(), the supervisor requeues the rows of a worker that dies.
+    job_queue.recover(reset_running=not forked_worker)
+
+    # Warm up in the background so /health answers as soon as uvicorn binds.
+    # Pre-forked workers inherit an already warm parent and skip this.
+    if ready.is_set():
+        return
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if job_queue is not None:
+        job_queue.shutdown()
+
+
+@app.post("/predict", openapi_extra=UPLOAD_OPENAPI)
+async def predict_sentiment(request: Request, background_tasks: BackgroundTasks):
+    fd, temp_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        await save_upload(request, temp_path, MAX_UPLOAD_BYTES)
+        if model is None or label_encoder is None:
+            return {"error": "Model not loaded"}
+        # Decoding and scoring are CPU-bound; keep them off the event loop.
+        result, features, prediction = await run_in_threadpool(score_file, temp_path)
+        # Sampling runs after the response has been sent.
+        background_tasks.add_task(
+            log_traffic, features, prediction, result["confidence"]
+        )
+        return result
+
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except MissingUpload as e:
+        return JSONResponse(status_code=422, content={"error": str(e)})
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return {"error": str(e)}
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@app.post("/jobs", status_code=202, openapi_extra=UPLOAD_OPENAPI)
+async def submit_job(request: Request):
+    if not ready.is_set():
+        return JSONResponse(status_code=503, content={"error": "Model not ready"})
+
+    # Both rejections happen before any of the body is read.
+    try:
+        check_content_length(request.headers, MAX_UPLOAD_BYTES)
+        job_queue.check_capacity()
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except QueueFull as e:
+        return JSONResponse(status_code=429, content={"error": str(e)})
+
+    job_id, upload_path = job_queue.new_upload_path()
+    try:
+        await save_upload(request, upload_path, MAX_UPLOAD_BYTES)
+        job_queue.submit(job_id, upload_path)
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except MissingUpload as e:
+        return JSONResponse(status_code=422, content={"error": str(e)})
+    except QueueFull as e:
+        return JSONResponse(status_code=429, content={"error": str(e)})
+
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Return a job's status; wait > 0 long-polls for up to that many seconds."""
+    wait = min(max(wait, 0), MAX_JOB_WAIT_SECONDS)
+    if wait:
+        job = await run_in_threadpool(job_queue.wait, job_id, wait)
+    else:
+        job = job_queue.store.get(job_id)
+
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job
 
 
 @app.get("/health")
@@ -78,6 +265,100 @@ async def health_check():
     return {"status": "healthy"}
 
 
-if __name__ == "__main__":
+@app.get("/ready")
+async def readiness_check():
+    if not ready.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready", "feature_schema": processor.schema["schema_id"]}
+
+
+def serve(host="0.0.0.0", port=8000, workers=1):
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    # Load the model once in the parent and fork the workers afterwards so
+    # they share its pages copy-on-write instead of each holding a copy.
+    # Freezing the GC keeps collections in the children from writing to
+    # (and thereby un-sharing) the objects created before the fork.
+    warm_up()
+    job_store = JobStore(os.path.join(JOB_DIR, "jobs.db"))
+    job_store.requeue_interrupted()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    def spawn_worker():
+        global forked_worker
+        pid = os.fork()
+        if pid == 0:
+            forked_worker = True
+            # Respawned workers are forked after the parent installed its
+            # supervisor handlers; let uvicorn install its own instead.
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                config = uvicorn.Config(app, host=host, port=port)
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                logger.exception("Worker crashed")
+                os._exit(1)
+            os._exit(0)
+        started[pid] = time.monotonic()
+        return pid
+
+    started = {}
+    for _ in range(workers):
+        spawn_worker()
+    logger.info(f"Started {workers} workers: {list(started)}")
+
+    stopping = False
+
+    def _terminate(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(started):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _terminate)
+    signal.signal(signal.SIGINT, _terminate)
+
+    # Supervise: a worker that exits while we are not shutting down is
+    # replaced, so a crash does not silently shrink capacity.
+    while started:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        lifetime = time.monotonic() - started.pop(pid, time.monotonic())
+        # Jobs the worker had claimed would otherwise stay "running" forever;
+        # the replacement worker picks them up again in recover().
+        requeued = job_store.requeue_interrupted(owner_pid=pid)
+        if requeued:
+            logger.warning(f"Requeued {requeued} jobs left running by worker {pid}")
+        if stopping:
+            continue
+        logger.warning(f"Worker {pid} exited with status {status}, restarting")
+        if lifetime < RESPAWN_BACKOFF_SECONDS:
+            # Avoid a tight fork loop when workers die right after starting.
+            time.sleep(RESPAWN_BACKOFF_SECONDS)
+        if not stopping:
+            spawn_worker()
+    sock.close()
+
+
+if __name__ == "__main__":
+    serve(
+        host=os.environ.get("API_HOST", "0.0.0.0"),
+        port=int(os.environ.get("API_PORT", "8000")),
+        workers=int(os.environ.get("API_WORKERS", "1")),
+    )
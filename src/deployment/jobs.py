@@ -0,0 +1,360 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Expired jobs are purged at most this often per process.
+PURGE_INTERVAL_SECONDS = 60
+
+
+class QueueFull(Exception):
+    pass
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class MissingUpload(Exception):
+    pass
+
+
+def check_content_length(headers, max_bytes):
+    """Reject a request from its Content-Length header, before the body is read."""
+    length = headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+
+
+def _multipart_writer(f, boundary, field):
+    """Feed function that writes one multipart/form-data field's content to f.
+
+    Returns (feed, found) where found() reports whether the field was seen.
+    """
+    from python_multipart.multipart import MultipartParser, parse_options_header
+
+    state = {"header": b"", "value": b"", "in_field": False, "found": False}
+
+    def on_header_field(data, start, end):
+        state["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        if state["header"].lower() == b"content-disposition":
+            _, options = parse_options_header(state["value"])
+            state["in_field"] = options.get(b"name") == field.encode()
+            state["found"] = state["found"] or state["in_field"]
+        state["header"], state["value"] = b"", b""
+
+    def on_part_data(data, start, end):
+        if state["in_field"]:
+            f.write(data[start:end])
+
+    def on_part_end():
+        state["in_field"] = False
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    return parser.write, lambda: state["found"]
+
+
+async def save_upload(request, dest_path, max_bytes, field="file"):
+    """Stream a request body to disk, aborting once max_bytes is exceeded.
+
+    multipart/form-data bodies (e.g. curl -F file=@clip.wav) are parsed as
+    they arrive and only the named field is written; any other body is
+    written as-is. Content-Length is checked before anything is read.
+    """
+    from python_multipart.multipart import parse_options_header
+
+    check_content_length(request.headers, max_bytes)
+    content_type, options = parse_options_header(
+        request.headers.get("content-type", "")
+    )
+
+    written = 0
+    try:
+        with open(dest_path, "wb") as f:
+            if content_type == b"multipart/form-data":
+                feed, found = _multipart_writer(f, options.get(b"boundary", b""), field)
+            else:
+                feed, found = f.write, lambda: written > 0
+            async for chunk in request.stream():
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                feed(chunk)
+        if not found():
+            raise MissingUpload(f"No '{field}' upload in request")
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return written
+
+
+class JobStore:
+    """SQLite-backed job table shared by every worker process on the host."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " audio_path TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " owner_pid INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_pid" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the store safe to use from
+        # the executor threads and from forked API workers alike.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job_id, audio_path):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, audio_path, created_at, updated_at)"
+                " VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, audio_path, now, now),
+            )
+
+    def claim(self, job_id):
+        """Atomically move a job from queued to running; False if someone else did.
+
+        The claiming process's pid is recorded, so a supervisor can requeue
+        the job if that process dies before finishing it.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'running', owner_pid = ?, updated_at = ?"
+                " WHERE id = ? AND status = 'queued'",
+                (os.getpid(), time.time(), job_id),
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, result):
+        self._update(job_id, "done", result=json.dumps(result))
+
+    def fail(self, job_id, error):
+        self._update(job_id, "failed", error=error)
+
+    def _update(self, job_id, status, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def audio_path(self, job_id):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT audio_path FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+
+    def count(self, status):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def requeue_interrupted(self, owner_pid=None):
+        """Reset jobs left running by a process that died mid-job.
+
+        With owner_pid, only jobs claimed by that process are reset, so
+        jobs its live siblings are running stay untouched.
+        """
+        query = (
+            "UPDATE jobs SET status = 'queued', updated_at = ?"
+            " WHERE status = 'running'"
+        )
+        params = (time.time(),)
+        if owner_pid is not None:
+            query += " AND owner_pid = ?"
+            params += (owner_pid,)
+        with self._connect() as conn:
+            return conn.execute(query, params).rowcount
+
+    def purge_finished(self, before):
+        """Delete done and failed jobs last updated before the given time."""
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM jobs"
+                " WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (before,),
+            ).rowcount
+
+    def queued_ids(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobQueue:
+    """Runs queued jobs on a local thread pool, bounded by max_depth queued jobs.
+
+    Finished jobs are kept for retention_seconds so clients can collect
+    their results, then purged; None keeps them forever.
+    """
+
+    def __init__(self, store, handler, upload_dir, workers=2, max_depth=100,
+                 retention_seconds=None):
+        self.store = store
+        self.handler = handler
+        self.upload_dir = upload_dir
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="job"
+        )
+        self._done = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def new_upload_path(self):
+        job_id = uuid.uuid4().hex
+        return job_id, os.path.join(self.upload_dir, f"{job_id}.upload")
+
+    def check_capacity(self):
+        """Raise QueueFull if no more jobs may be queued."""
+        if self.store.count("queued") >= self.max_depth:
+            raise QueueFull(f"Job queue is full ({self.max_depth} queued)")
+
+    def submit(self, job_id, audio_path):
+        try:
+            self.check_capacity()
+        except QueueFull:
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            raise
+        self.store.create(job_id, audio_path)
+        self._schedule(job_id)
+        return job_id
+
+    def recover(self, reset_running=True):
+        """Schedule jobs persisted by a previous run.
+
+        Pass reset_running=False when sibling processes share the store and
+        may legitimately be running jobs right now.
+        """
+        if reset_running:
+            self.store.requeue_interrupted()
+        self.purge_expired()
+        job_ids = self.store.queued_ids()
+        for job_id in job_ids:
+            self._schedule(job_id)
+        if job_ids:
+            logger.info(f"Recovered {len(job_ids)} queued jobs")
+
+    def purge_expired(self):
+        """Delete finished jobs older than retention_seconds; returns the count."""
+        if self.retention_seconds is None:
+            return 0
+        with self._lock:
+            self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+        purged = self.store.purge_finished(time.time() - self.retention_seconds)
+        if purged:
+            logger.info(f"Purged {purged} finished jobs")
+        return purged
+
+    def _schedule(self, job_id):
+        with self._lock:
+            self._done[job_id] = threading.Event()
+        self.executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        try:
+            if not self.store.claim(job_id):
+                return
+            audio_path = self.store.audio_path(job_id)
+            try:
+                self.store.finish(job_id, self.handler(audio_path))
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                self.store.fail(job_id, str(e))
+            finally:
+                if os.path.exists(audio_path):
+                    os.remove(audio_path)
+        finally:
+            with self._lock:
+                event = self._done.pop(job_id, None)
+                purge_due = time.monotonic() >= self._next_purge
+            if event is not None:
+                event.set()
+            if purge_due:
+                self.purge_expired()
+
+    def wait(self, job_id, timeout, poll_interval=0.25):
+        """Block until a job finishes or timeout expires, then return it."""
+        with self._lock:
+            event = self._done.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+            return self.store.get(job_id)
+
+        # Not scheduled by this process (e.g. a sibling worker): poll the store.
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in ("done", "failed"):
+                return job
+            if time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
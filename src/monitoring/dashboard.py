@@ -5,6 +5,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring.traffic import TrafficLog, evaluate_traffic, latest_traffic_log
+
+# Traffic panels and the predictions pie cover this trailing window.
+TRAFFIC_WINDOW_SECONDS = 24 * 3600
 
 
 def generate_sample_metrics():
@@ -22,6 +31,30 @@ def generate_sample_metrics():
     return pd.DataFrame(metrics_data)
 
 
+@st.cache_resource
+def load_shadow_model(model_uri):
+    """Registry model, loaded once per dashboard process rather than on every rerun"""
+    from monitoring.traffic import load_registry_model
+    return load_registry_model(model_uri)
+
+
+def load_traffic_metrics():
+    """Metrics over the last day of sampled traffic, or None if nothing was logged"""
+    path = latest_traffic_log(os.environ.get("TRAFFIC_LOG_DIR", "logs"))
+    if path is None:
+        return None
+
+    shadow_uri = os.environ.get("SHADOW_MODEL_URI")
+    shadow_model, shadow_classes = (
+        load_shadow_model(shadow_uri) if shadow_uri else (None, None)
+    )
+
+    metrics = evaluate_traffic(TrafficLog.open(path), shadow_model=shadow_model,
+                               since=time.time() - TRAFFIC_WINDOW_SECONDS,
+                               shadow_classes=shadow_classes)
+    return metrics if metrics["n_samples"] else None
+
+
 def main():
     st.set_page_config(page_title="Audio Sentiment Model Monitoring", layout="wide")
     
@@ -37,25 +70,38 @@ def main():
     
     # Generate sample data
     df = generate_sample_metrics()
+    traffic = load_traffic_metrics()
     
     # Main metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Current Accuracy", f"{df['accuracy'].iloc[-1]:.3f}", f"{df['accuracy'].diff().iloc[-1]:.3f}")
+        # Live traffic has no labels, so accuracy itself is only simulated;
+        # shadow agreement or mean confidence are the real signals available.
+        if traffic is not None and "shadow" in traffic:
+            st.metric("Shadow Agreement", f"{traffic['shadow']['agreement']:.3f}")
+        elif traffic is not None:
+            st.metric("Mean Confidence", f"{traffic['live_confidence']['mean']:.3f}")
+        else:
+            st.metric("Accuracy (simulated)", f"{df['accuracy'].iloc[-1]:.3f}",
+                      f"{df['accuracy'].diff().iloc[-1]:.3f}")
     
     with col2:
-        st.metric("Avg Latency (s)", f"{df['latency'].iloc[-1]:.3f}", f"{df['latency'].diff().iloc[-1]:.3f}")
+        st.metric("Avg Latency (s, simulated)", f"{df['latency'].iloc[-1]:.3f}",
+                  f"{df['latency'].diff().iloc[-1]:.3f}")
     
     with col3:
-        st.metric("Daily Requests", int(df['throughput'].iloc[-1]), int(df['throughput'].diff().iloc[-1]))
+        st.metric("Daily Requests (simulated)", int(df['throughput'].iloc[-1]),
+                  int(df['throughput'].diff().iloc[-1]))
     
     with col4:
         drift_status = "🟢 Normal" if df['drift_score'].iloc[-1] < 0.1 else "🔴 Alert"
-        st.metric("Data Drift", drift_status, f"{df['drift_score'].diff().iloc[-1]:.3f}")
+        st.metric("Data Drift (simulated)", drift_status,
+                  f"{df['drift_score'].diff().iloc[-1]:.3f}")
     
     # Charts
     st.subheader("Model Performance Trends")
+    st.caption("Simulated data: no labelled production metrics are recorded yet.")
     
     col1, col2 = st.columns(2)
     
@@ -74,17 +120,50 @@ def main():
     fig_drift.add_trace(go.Scatter(x=df['date'], y=df['drift_score'], name='Drift Score'))
     fig_drift.add_hline(y=0.1, line_dash="dash", line_color="orange", annotation_text="Warning Threshold")
     fig_drift.add_hline(y=0.2, line_dash="dash", line_color="red", annotation_text="Critical Threshold")
-    fig_drift.update_layout(title='Data Drift Score Over Time')
+    fig_drift.update_layout(title='Data Drift Score Over Time (simulated)')
     st.plotly_chart(fig_drift, use_container_width=True)
     
+    # Sampled production traffic
+    if traffic is not None:
+        st.subheader("Sampled Traffic (Last 24h)")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Sampled Requests", traffic["n_samples"])
+        with col2:
+            st.metric("Mean Confidence", f"{traffic['live_confidence']['mean']:.3f}")
+        with col3:
+            if "shadow" in traffic:
+                st.metric("Shadow Agreement", f"{traffic['shadow']['agreement']:.3f}")
+            else:
+                st.metric("Shadow Agreement", "n/a")
+
+        confidence_df = pd.DataFrame({
+            'bin': [f"{b:.1f}" for b in np.linspace(0, 0.9, 10)],
+            'live': traffic['live_confidence']['histogram'],
+        })
+        if "shadow" in traffic:
+            confidence_df['shadow'] = traffic['shadow']['confidence']['histogram']
+        models = [c for c in confidence_df.columns if c != 'bin']
+        fig_conf = px.bar(confidence_df, x='bin', y=models, barmode='group',
+                          title='Confidence Distribution')
+        st.plotly_chart(fig_conf, use_container_width=True)
+
     # Predictions distribution
     st.subheader("Recent Predictions Distribution")
-    sentiment_dist = pd.DataFrame({
-        'sentiment': ['positive', 'negative', 'neutral'],
-        'count': np.random.multinomial(1000, [0.4, 0.3, 0.3])
-    })
-    
-    fig_pie = px.pie(sentiment_dist, values='count', names='sentiment', title='Sentiment Distribution (Last 24h)')
+    if traffic is not None:
+        sentiment_dist = pd.DataFrame({
+            'sentiment': list(traffic['prediction_distribution']),
+            'count': list(traffic['prediction_distribution'].values())
+        })
+    else:
+        sentiment_dist = pd.DataFrame({
+            'sentiment': ['positive', 'negative', 'neutral'],
+            'count': np.random.multinomial(1000, [0.4, 0.3, 0.3])
+        })
+
+    window = "Last 24h" if traffic is not None else "simulated"
+    fig_pie = px.pie(sentiment_dist, values='count', names='sentiment',
+                     title=f'Sentiment Distribution ({window})')
     st.plotly_chart(fig_pie)
     
     # Recent logs
@@ -1,7 +1,12 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 import logging
 
+# Add src directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -97,10 +102,60 @@ class ModelMonitor:
             
         return drift_detected, drift_score
     
+    def feature_drift_score(self, reference_data, current_data, alpha=0.05):
+        """Share of columns whose distribution shifted (two-sample KS test at alpha)"""
+        from scipy.stats import ks_2samp
+
+        drifted = [
+            ks_2samp(reference_data[col], current_data[col]).pvalue < alpha
+            for col in reference_data.columns if col in current_data.columns
+        ]
+        return float(np.mean(drifted)) if drifted else 0.0
+
+    def check_feature_drift(self, reference_data, current_data, threshold=0.3):
+        drift_score = self.feature_drift_score(reference_data, current_data)
+        drift_detected = drift_score >= threshold
+
+        if drift_detected:
+            logger.warning(
+                f"Feature drift detected! {drift_score:.0%} of features shifted"
+            )
+            self.send_alert(f"Feature drift detected with score: {drift_score:.3f}")
+        else:
+            logger.info(f"No significant feature drift. Score: {drift_score:.3f}")
+
+        return drift_detected, drift_score
+
     def send_alert(self, message):
         logger.warning(f"ALERT: {message}")
 
 
+def monitor_traffic(reference_features, traffic_log, since=None, threshold=0.3,
+                    min_samples=50):
+    """Compare sampled live features against the training reference.
+
+    Returns (drift_detected, drift_score, n_samples); too few samples is
+    reported as no drift rather than a noisy verdict.
+    """
+    from data_processing.features import feature_names
+
+    records = traffic_log.read(since=since)
+    if len(records) < min_samples:
+        logger.info(
+            f"Only {len(records)} sampled requests, need {min_samples} for drift check"
+        )
+        return False, 0.0, len(records)
+
+    columns = feature_names(traffic_log.schema["feature_sets"])
+    reference_data = pd.DataFrame(reference_features, columns=columns)
+    current_data = pd.DataFrame(records["features"], columns=columns)
+
+    drift_detected, drift_score = ModelMonitor().check_feature_drift(
+        reference_data, current_data, threshold=threshold
+    )
+    return drift_detected, drift_score, len(records)
+
+
 def simulate_monitoring():
     monitor = ModelMonitor()
     
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_BINS = np.linspace(0.0, 1.0, 11)
+# MLflow run artifact with the label encoder's classes, logged by
+# ModelTrainer.train_model so registry models' predictions can be decoded.
+LABEL_CLASSES_ARTIFACT = "label_classes.json"
+
+
+def record_dtype(n_features):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("prediction", "<i2"),
+        ("confidence", "<f4"),
+        ("features", "<f4", (n_features,)),
+    ])
+
+
+class TrafficLog:
+    """Append-only log of sampled requests, one fixed-width record each.
+
+    Records are written with a single O_APPEND write so concurrent API
+    workers can share a file. A JSON sidecar holds the feature schema and
+    class labels needed to interpret the records. The file name carries
+    both, so a model with other classes starts a new log instead of
+    reinterpreting the old records' class indices.
+    """
+
+    def __init__(self, log_dir, schema, classes, name=None):
+        self.schema = schema
+        self.classes = [str(c) for c in classes]
+        self.dtype = record_dtype(schema["n_features"])
+        if name is None:
+            classes_id = hashlib.blake2b(
+                json.dumps(self.classes).encode(), digest_size=4
+            ).hexdigest()
+            name = f"traffic-{schema['schema_id']}-{classes_id}"
+        self.path = os.path.join(log_dir, f"{name}.bin")
+        self.meta_path = os.path.join(log_dir, f"{name}.json")
+
+        os.makedirs(log_dir, exist_ok=True)
+        if not os.path.exists(self.meta_path):
+            with open(self.meta_path, "w") as f:
+                json.dump({"schema": schema, "classes": self.classes}, f, indent=2)
+
+    @classmethod
+    def open(cls, path):
+        """Open an existing log for reading from its .bin or .json path."""
+        base = os.path.splitext(path)[0]
+        with open(base + ".json") as f:
+            meta = json.load(f)
+        return cls(os.path.dirname(base), meta["schema"], meta["classes"],
+                   name=os.path.basename(base))
+
+    def append(self, features, prediction, confidence):
+        record = np.zeros(1, dtype=self.dtype)
+        record["timestamp"] = time.time()
+        record["prediction"] = prediction
+        record["confidence"] = confidence
+        record["features"] = features
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, record.tobytes())
+        finally:
+            os.close(fd)
+
+    def read(self, since=None):
+        if not os.path.exists(self.path):
+            return np.zeros(0, dtype=self.dtype)
+        # Ignore a trailing partial record left by a writer that died mid-write.
+        n_records = os.path.getsize(self.path) // self.dtype.itemsize
+        records = np.fromfile(self.path, dtype=self.dtype, count=n_records)
+        if since is not None:
+            records = records[records["timestamp"] >= since]
+        return records
+
+
+def confidence_summary(confidence):
+    counts, _ = np.histogram(confidence, bins=CONFIDENCE_BINS)
+    return {
+        "mean": float(np.mean(confidence)),
+        "p10": float(np.percentile(confidence, 10)),
+        "p50": float(np.percentile(confidence, 50)),
+        "p90": float(np.percentile(confidence, 90)),
+        "histogram": counts.tolist(),
+    }
+
+
+def evaluate_traffic(traffic_log, shadow_model=None, since=None,
+                     shadow_classes=None):
+    """Batch metrics over sampled traffic, optionally scoring a shadow model.
+
+    The shadow model scores the logged features here, never on the request
+    path, so it adds no latency to /predict. shadow_classes are the labels
+    its integer predictions decode to; predictions are compared as labels,
+    since the shadow model's encoder may order or cover classes differently.
+    """
+    records = traffic_log.read(since=since)
+    if len(records) == 0:
+        return {"n_samples": 0}
+
+    classes = traffic_log.classes
+    live_pred = records["prediction"].astype(int)
+    counts = np.bincount(live_pred, minlength=len(classes))
+
+    metrics = {
+        "n_samples": int(len(records)),
+        "schema_id": traffic_log.schema["schema_id"],
+        "start": float(records["timestamp"].min()),
+        "end": float(records["timestamp"].max()),
+        "prediction_distribution": {c: int(n) for c, n in zip(classes, counts)},
+        "live_confidence": confidence_summary(records["confidence"]),
+    }
+
+    if shadow_model is not None:
+        n_features = getattr(shadow_model, "n_features_in_", None)
+        if n_features is not None and n_features != traffic_log.schema["n_features"]:
+            raise ValueError(
+                f"Shadow model expects {n_features} features, log has "
+                f"{traffic_log.schema['n_features']}"
+            )
+        if shadow_classes is None:
+            logger.warning(
+                "Shadow model classes unknown; assuming the live label encoder"
+            )
+            shadow_classes = classes
+        shadow_proba = shadow_model.predict_proba(records["features"])
+        shadow_pred = np.asarray(shadow_model.classes_)[np.argmax(shadow_proba, axis=1)]
+        shadow_labels = np.asarray([str(c) for c in shadow_classes])[shadow_pred]
+        agree = shadow_labels == np.asarray(classes)[live_pred]
+
+        metrics["shadow"] = {
+            "agreement": float(np.mean(agree)),
+            "per_class_agreement": {
+                c: float(np.mean(agree[live_pred == i]))
+                for i, c in enumerate(classes) if np.any(live_pred == i)
+            },
+            "confidence": confidence_summary(shadow_proba.max(axis=1)),
+            "mean_confidence_delta": float(
+                np.mean(shadow_proba.max(axis=1) - records["confidence"])
+            ),
+        }
+
+    return metrics
+
+
+def load_registry_model(model_uri):
+    """Load a candidate model, e.g. models:/sentiment_classifier/Staging.
+
+    Returns (model, classes); classes is None for runs that did not log
+    their label encoder's classes.
+    """
+    import mlflow
+    import mlflow.sklearn
+
+    model = mlflow.sklearn.load_model(model_uri)
+    run_id = mlflow.models.get_model_info(model_uri).run_id
+    try:
+        classes = mlflow.artifacts.load_dict(
+            f"runs:/{run_id}/{LABEL_CLASSES_ARTIFACT}"
+        )["classes"]
+    except Exception as e:
+        logger.warning(f"No label classes logged for {model_uri}: {e}")
+        classes = None
+    return model, classes
+
+
+def latest_traffic_log(log_dir):
+    logs = [
+        os.path.join(log_dir, name) for name in os.listdir(log_dir)
+        if name.startswith("traffic-") and name.endswith(".bin")
+    ] if os.path.isdir(log_dir) else []
+    return max(logs, key=os.path.getmtime) if logs else None
+
+
+def main():
+    log_dir = os.environ.get("TRAFFIC_LOG_DIR", "logs")
+    path = sys.argv[1] if len(sys.argv) > 1 else latest_traffic_log(log_dir)
+    if path is None:
+        logger.error(f"No traffic log found in {log_dir}")
+        return
+
+    shadow_uri = os.environ.get("SHADOW_MODEL_URI")
+    shadow_model, shadow_classes = (
+        load_registry_model(shadow_uri) if shadow_uri else (None, None)
+    )
+
+    metrics = evaluate_traffic(TrafficLog.open(path), shadow_model=shadow_model,
+                               shadow_classes=shadow_classes)
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
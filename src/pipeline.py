@@ -1,28 +1,42 @@
 from prefect import flow, task
 import os
 import sys
+import time
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from training.train import ModelTrainer
+from training.retrain import check_live_drift, run_retraining_cycle
 from data_processing.audio_processor import AudioProcessor
+from data_processing.dedup import DuplicateIndex
+from data_processing.feature_cache import FeatureCache
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DATA_DIR = "data/audio_files"
+MODEL_PATH = "models"
+CACHE_DIR = "cache"
+TRAFFIC_LOG_DIR = os.environ.get("TRAFFIC_LOG_DIR", "logs")
+DRIFT_THRESHOLD = float(os.environ.get("DRIFT_THRESHOLD", "0.3"))
+
 
 @task
 def process_data():
     logger.info("Processing audio data...")
     processor = AudioProcessor()
-    data_dir = "data/audio_files"
     
-    if not os.path.exists(data_dir):
-        logger.error(f"Data directory {data_dir} not found")
+    if not os.path.exists(DATA_DIR):
+        logger.error(f"Data directory {DATA_DIR} not found")
         return None
     
-    return processor.prepare_data(data_dir)
+    cache = FeatureCache(CACHE_DIR, processor.schema)
+    try:
+        data = processor.prepare_data(DATA_DIR, cache=cache, dedup=DuplicateIndex())
+        return data + (processor.schema,)
+    finally:
+        cache.close()
 
 
 @task
@@ -31,12 +45,15 @@ def train_model(data):
         logger.error("No data provided for training")
         return None
         
-    X_train, X_test, y_train, y_test, le = data
+    X_train, X_test, y_train, y_test, le, feature_schema = data
     logger.info("Training model...")
     
     trainer = ModelTrainer()
-    model, accuracy = trainer.train_model(X_train, y_train, X_test, y_test)
-    trainer.save_model(model, le)
+    model, accuracy = trainer.train_model(
+        X_train, y_train, X_test, y_test, label_encoder=le
+    )
+    trainer.save_model(model, le, feature_schema=feature_schema,
+                       reference_features=X_train)
     
     return model, accuracy
 
@@ -44,8 +61,9 @@ def train_model(data):
 @task
 def monitor_model():
     logger.info("Running model monitoring...")
-    from monitoring.monitor import simulate_monitoring
-    drift_detected, drift_score = simulate_monitoring()
+    drift_detected, drift_score, n_samples = check_live_drift(
+        MODEL_PATH, TRAFFIC_LOG_DIR, threshold=DRIFT_THRESHOLD
+    )
     
     if drift_detected:
         logger.warning("Model retraining recommended due to data drift")
@@ -53,6 +71,15 @@ def monitor_model():
     return drift_detected
 
 
+@task
+def retrain_model():
+    if not os.path.exists(DATA_DIR):
+        logger.error(f"Data directory {DATA_DIR} not found")
+        return None
+
+    return run_retraining_cycle(DATA_DIR, model_path=MODEL_PATH, cache_dir=CACHE_DIR)
+
+
 @flow(name="ml_pipeline")
 def ml_pipeline():
     logger.info("Starting ML pipeline...")
@@ -70,6 +97,29 @@ def ml_pipeline():
     return {"drift_detected": drift_detected, "model_trained": model_result is not None}
 
 
+@flow(name="drift_retraining_pipeline")
+def drift_retraining_pipeline():
+    """Retrain only when sampled live traffic has drifted from the training data."""
+    logger.info("Checking live traffic for drift...")
+    start = time.perf_counter()
+
+    drift_detected = monitor_model()
+    cycle = retrain_model() if drift_detected else None
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Drift retraining pipeline finished in {elapsed:.2f}s")
+
+    return {
+        "drift_detected": drift_detected,
+        "retrained": cycle is not None,
+        "promoted": bool(cycle and cycle["promoted"]),
+        "elapsed_seconds": elapsed,
+    }
+
+
 if __name__ == "__main__":
-    result = ml_pipeline()
+    if len(sys.argv) > 1 and sys.argv[1] == "retrain":
+        result = drift_retraining_pipeline()
+    else:
+        result = ml_pipeline()
     logger.info(f"Pipeline result: {result}")
@@ -0,0 +1,99 @@
+import pickle
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Leaf class probabilities are stored as uint8 fractions of this value.
+PROBA_LEVELS = 255
+
+
+class CompactForest:
+    """Array-backed copy of a fitted RandomForestClassifier.
+
+    All trees are flattened into shared float32/int32 node arrays and the
+    leaf class probabilities are quantized to uint8, which makes the model a
+    handful of contiguous buffers instead of thousands of Python objects.
+    It exposes the predict/predict_proba surface the API relies on.
+    """
+
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise ValueError("CompactForest only supports single-output forests")
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        self.roots = offsets.astype(np.int32)
+        self.feature = np.concatenate([tree.feature for tree in trees]).astype(np.int32)
+        self.threshold = np.concatenate([tree.threshold for tree in trees]).astype(np.float32)
+
+        # Re-base child indices onto the concatenated arrays; leaves point to
+        # themselves so traversal can run a fixed number of steps.
+        left, right = [], []
+        for offset, tree in zip(offsets, trees):
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+        self.left = np.concatenate(left).astype(np.int32)
+        self.right = np.concatenate(right).astype(np.int32)
+        self.feature[self.left == np.arange(len(self.left))] = 0
+
+        values = np.concatenate([tree.value[:, 0, :] for tree in trees])
+        totals = values.sum(axis=1, keepdims=True)
+        proba = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+        self.leaf_proba = np.round(proba * PROBA_LEVELS).astype(np.uint8)
+
+        self.depth = max(tree.max_depth for tree in trees)
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.n_estimators = len(trees)
+
+    @property
+    def nbytes(self):
+        return sum(
+            array.nbytes for array in
+            (self.roots, self.feature, self.threshold, self.left, self.right, self.leaf_proba)
+        )
+
+    def apply(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators)).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = self.leaf_proba[leaves].sum(axis=1, dtype=np.float32)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compare_models(full_model, compact_model, X_test_full, X_test_compact, y_test):
+    """Memory and accuracy of the compact path against the full-precision one.
+
+    X_test_full are the float64 features the full model is scored on;
+    X_test_compact the same rows at the (possibly reduced) precision the
+    compact model is served with.
+    """
+    full_pred = full_model.predict(X_test_full)
+    compact_pred = compact_model.predict(X_test_compact)
+    full_bytes = len(pickle.dumps(full_model))
+    compact_bytes = len(pickle.dumps(compact_model))
+
+    return {
+        "model_bytes_full": full_bytes,
+        "model_bytes_compact": compact_bytes,
+        "model_memory_saved": 1 - compact_bytes / full_bytes,
+        "feature_bytes_full": np.asarray(X_test_full).nbytes,
+        "feature_bytes_compact": np.asarray(X_test_compact).nbytes,
+        "accuracy_full": float(np.mean(full_pred == y_test)),
+        "accuracy_compact": float(np.mean(compact_pred == y_test)),
+        "prediction_agreement": float(np.mean(full_pred == compact_pred)),
+    }
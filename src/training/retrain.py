@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import numpy as np
+import logging
+
+# Add src directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing.audio_processor import AudioProcessor
+from data_processing.dedup import DuplicateIndex
+from data_processing.feature_cache import FeatureCache
+from training.train import ModelTrainer, load_saved_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def check_live_drift(model_path="models", traffic_log_dir="logs", lookback_hours=24,
+                     threshold=0.3, min_samples=50):
+    """Drift of recently sampled traffic against the deployed model's training features.
+
+    Returns (drift_detected, drift_score, n_samples).
+    """
+    from monitoring.monitor import monitor_traffic
+    from monitoring.traffic import TrafficLog
+
+    reference_path = os.path.join(model_path, "reference_features.npy")
+    if not os.path.exists(reference_path):
+        logger.warning(
+            f"No training reference at {reference_path}, skipping drift check"
+        )
+        return False, 0.0, 0
+
+    _, label_encoder, schema = load_saved_model(model_path)
+    schema = schema or AudioProcessor().schema
+    traffic_log = TrafficLog(traffic_log_dir, schema, label_encoder.classes_)
+
+    return monitor_traffic(
+        np.load(reference_path), traffic_log,
+        since=time.time() - lookback_hours * 3600,
+        threshold=threshold, min_samples=min_samples,
+    )
+
+
+def evaluate_model(model, label_encoder, X, labels):
+    """Accuracy against string labels, so models with different encoders compare."""
+    predicted = label_encoder.inverse_transform(model.predict(X))
+    return float(np.mean(predicted == labels))
+
+
+def run_retraining_cycle(data_dir, csv_file=None, model_path="models",
+                         cache_dir="cache", feature_sets="basic", min_improvement=0.0,
+                         trainer=None, dedup=True, vad_top_db=None):
+    """Featurize (reusing cached vectors), train a candidate, promote it unless worse.
+
+    Both models are scored on the candidate's held-out split, which is
+    chosen by a hash of each file's path (prepare_data's stable_holdout).
+    When the current model also came from a retraining cycle, the same
+    files were held out then and neither model has seen them. Ties go to
+    the candidate, which was trained on more data.
+    """
+    timings = {}
+    cycle_start = time.perf_counter()
+
+    processor = AudioProcessor(feature_sets=feature_sets, vad_top_db=vad_top_db)
+    cache = FeatureCache(cache_dir, processor.schema)
+    try:
+        X_train, X_test, y_train, y_test, le = processor.prepare_data(
+            data_dir, csv_file, cache=cache,
+            dedup=DuplicateIndex() if dedup else None, stable_holdout=True,
+        )
+    finally:
+        cache.close()
+    timings["featurize"] = time.perf_counter() - cycle_start
+
+    stage_start = time.perf_counter()
+    trainer = trainer or ModelTrainer()
+    candidate, candidate_accuracy = trainer.train_model(
+        X_train, y_train, X_test, y_test, label_encoder=le
+    )
+    timings["train"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    current_accuracy = None
+    if os.path.exists(os.path.join(model_path, "model.pkl")):
+        current, current_le, current_schema = load_saved_model(model_path)
+        current_schema = current_schema or AudioProcessor().schema
+        if current_schema["schema_id"] != processor.schema["schema_id"]:
+            logger.warning(
+                f"Current model uses features {current_schema['schema_id']}, candidate "
+                f"{processor.schema['schema_id']}; promoting without comparison"
+            )
+        else:
+            current_accuracy = evaluate_model(
+                current, current_le, X_test, le.inverse_transform(y_test)
+            )
+    timings["evaluate"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    promoted = (current_accuracy is None
+                or candidate_accuracy >= current_accuracy + min_improvement)
+    if promoted:
+        trainer.save_model(candidate, le, model_path, feature_schema=processor.schema,
+                           reference_features=X_train)
+    timings["promote"] = time.perf_counter() - stage_start
+    timings["total"] = time.perf_counter() - cycle_start
+
+    current_str = "n/a" if current_accuracy is None else f"{current_accuracy:.4f}"
+    logger.info(
+        f"Retraining cycle: candidate {candidate_accuracy:.4f} "
+        f"vs current {current_str}, "
+        f"{'promoted' if promoted else 'kept current model'}; "
+        f"featurized {cache.misses} new / {cache.hits} cached files; "
+        + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+    )
+
+    return {
+        "promoted": promoted,
+        "candidate_accuracy": candidate_accuracy,
+        "current_accuracy": current_accuracy,
+        "new_files": cache.misses,
+        "cached_files": cache.hits,
+        "timings": timings,
+    }
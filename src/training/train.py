@@ -1,16 +1,15 @@
 import os
 import sys
+import json
 import pickle
-import mlflow
-import mlflow.sklearn
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
 import logging
 
 # Add src directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_processing.audio_processor import AudioProcessor
+from data_processing.dedup import DuplicateIndex
+from monitoring.traffic import LABEL_CLASSES_ARTIFACT
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,10 +17,20 @@ logger = logging.getLogger(__name__)
 
 class ModelTrainer:
     def __init__(self, experiment_name="audio_sentiment"):
+        # mlflow and sklearn are imported on use so that importing this
+        # module (e.g. from the pipeline) stays cheap.
+        import mlflow
+
         self.experiment_name = experiment_name
         mlflow.set_experiment(experiment_name)
 
-    def train_model(self, X_train, y_train, X_test, y_test):
+    def train_model(self, X_train, y_train, X_test, y_test, compact=False,
+                    feature_dtype="float64", label_encoder=None):
+        import mlflow
+        import mlflow.sklearn
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score, classification_report
+
         with mlflow.start_run():
             model = RandomForestClassifier(
                 n_estimators=100,
@@ -37,6 +46,11 @@ class ModelTrainer:
             mlflow.log_param("n_estimators", 100)
             mlflow.log_param("max_depth", 10)
             mlflow.log_metric("accuracy", accuracy)
+            if label_encoder is not None:
+                mlflow.log_dict(
+                    {"classes": [str(c) for c in label_encoder.classes_]},
+                    LABEL_CLASSES_ARTIFACT,
+                )
             
             mlflow.sklearn.log_model(
                 model, 
@@ -47,9 +61,40 @@ class ModelTrainer:
             logger.info(f"Model accuracy: {accuracy:.4f}")
             logger.info(f"Classification report:\n{classification_report(y_test, y_pred)}")
             
+            if compact:
+                # The registry keeps the full forest; the compact one is
+                # what gets saved for serving.
+                model, accuracy = self.compact_model(
+                    model, X_test, y_test, feature_dtype
+                )
+
             return model, accuracy
 
-    def save_model(self, model, label_encoder, model_path="models"):
+    def compact_model(self, model, X_test, y_test, feature_dtype="float64"):
+        import mlflow
+        import numpy as np
+        from training.compact import CompactForest, compare_models
+
+        # The full forest is scored on the float64 features it was trained
+        # on, the compact one on features reduced to the serving precision.
+        compact = CompactForest(model)
+        X_test_compact = np.asarray(X_test).astype(feature_dtype)
+        report = compare_models(model, compact, X_test, X_test_compact, y_test)
+        for key, value in report.items():
+            mlflow.log_metric(f"compact_{key}", value)
+
+        logger.info(
+            f"Compact model: {report['model_bytes_compact'] / 1e6:.2f} MB vs "
+            f"{report['model_bytes_full'] / 1e6:.2f} MB "
+            f"({report['model_memory_saved']:.0%} saved), "
+            f"accuracy {report['accuracy_compact']:.4f} "
+            f"vs {report['accuracy_full']:.4f}, "
+            f"agreement {report['prediction_agreement']:.4f}"
+        )
+        return compact, report["accuracy_compact"]
+
+    def save_model(self, model, label_encoder, model_path="models", feature_schema=None,
+                   reference_features=None):
         os.makedirs(model_path, exist_ok=True)
         
         with open(f"{model_path}/model.pkl", "wb") as f:
@@ -57,10 +102,37 @@ class ModelTrainer:
             
         with open(f"{model_path}/label_encoder.pkl", "wb") as f:
             pickle.dump(label_encoder, f)
+
+        # Lets the API rebuild the exact feature extraction the model was
+        # trained on and refuse to serve mismatched models.
+        if feature_schema is not None:
+            with open(f"{model_path}/feature_schema.json", "w") as f:
+                json.dump(feature_schema, f, indent=2)
+
+        # Training feature distribution that live traffic is checked against.
+        if reference_features is not None:
+            import numpy as np
+            np.save(f"{model_path}/reference_features.npy",
+                    np.asarray(reference_features, dtype=np.float32))
             
         logger.info(f"Model saved to {model_path}")
 
 
+def load_saved_model(model_path="models"):
+    """Return (model, label_encoder, feature_schema) written by save_model."""
+    with open(f"{model_path}/model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(f"{model_path}/label_encoder.pkl", "rb") as f:
+        label_encoder = pickle.load(f)
+
+    feature_schema = None
+    if os.path.exists(f"{model_path}/feature_schema.json"):
+        with open(f"{model_path}/feature_schema.json") as f:
+            feature_schema = json.load(f)
+
+    return model, label_encoder, feature_schema
+
+
 def main():
     # Get the project root directory (two levels up from this file)
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -75,15 +147,31 @@ def main():
         logger.error(f"Training CSV file {train_csv_file} not found")
         return
     
-    processor = AudioProcessor()
-    X_train, X_test, y_train, y_test, le = processor.prepare_data(train_data_dir, train_csv_file)
+    # Training rows are held at FEATURE_DTYPE; in compact mode the test rows
+    # stay float64 so the report can compare against the full-precision path.
+    feature_dtype = os.environ.get("FEATURE_DTYPE", "float64")
+    compact = os.environ.get("COMPACT_MODEL", "0") == "1"
+    vad_top_db = os.environ.get("VAD_TOP_DB")
+    processor = AudioProcessor(
+        feature_sets=os.environ.get("FEATURE_SET", "basic"),
+        feature_dtype=feature_dtype,
+        vad_top_db=float(vad_top_db) if vad_top_db else None,
+    )
+    dedup = DuplicateIndex() if os.environ.get("DEDUP", "1") == "1" else None
+    X_train, X_test, y_train, y_test, le = processor.prepare_data(
+        train_data_dir, train_csv_file, dedup=dedup, full_precision_test=compact
+    )
     
     trainer = ModelTrainer()
-    model, accuracy = trainer.train_model(X_train, y_train, X_test, y_test)
+    model, accuracy = trainer.train_model(
+        X_train, y_train, X_test, y_test, compact=compact, feature_dtype=feature_dtype,
+        label_encoder=le,
+    )
     
     # Save model in project root models directory
     model_path = os.path.join(project_root, "models")
-    trainer.save_model(model, le, model_path)
+    trainer.save_model(model, le, model_path, feature_schema=processor.schema,
+                       reference_features=X_train)
 
 
 if __name__ == "__main__":
@@ -38,3 +38,74 @@ class TestAudioProcessor:
     def test_processor_initialization(self):
         assert self.processor.sample_rate == 22050
         assert self.processor.duration == 3
+
+
+class TestFeatureSchema:
+    def setup_method(self):
+        self.audio = (np.random.randn(22050) * 0.1).astype(np.float32)
+
+    def test_basic_schema_matches_legacy_vector(self):
+        processor = AudioProcessor()
+        assert processor.schema["n_features"] == 15
+        assert processor.compute_features(self.audio).shape == (15,)
+
+    def test_extended_feature_set(self):
+        processor = AudioProcessor(feature_sets="extended")
+        features = processor.compute_features(self.audio)
+        assert features.shape == (processor.schema["n_features"],)
+        assert np.all(np.isfinite(features))
+        # The shared spectrogram pass must not change the basic prefix.
+        np.testing.assert_allclose(features[:15], AudioProcessor().compute_features(self.audio))
+
+    def test_schema_id_depends_on_feature_sets(self):
+        basic = AudioProcessor().schema["schema_id"]
+        assert AudioProcessor(feature_sets=["mfcc_mean", "chroma"]).schema["schema_id"] != basic
+        assert AudioProcessor(feature_sets="basic").schema["schema_id"] == basic
+
+    def test_from_schema_round_trip(self):
+        schema = AudioProcessor(feature_sets="extended").schema
+        assert AudioProcessor.from_schema(schema).schema == schema
+
+    def test_from_schema_rejects_stale_version(self):
+        schema = dict(AudioProcessor().schema, version=0, schema_id="v0-stale")
+        with pytest.raises(ValueError):
+            AudioProcessor.from_schema(schema)
+
+    def test_unknown_feature_set(self):
+        with pytest.raises(ValueError):
+            AudioProcessor(feature_sets=["not_a_feature"])
+
+
+class TestSilenceTrimming:
+    def setup_method(self):
+        t = np.arange(22050) / 22050
+        self.tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        self.silence = np.zeros(22050, dtype=np.float32)
+
+    def test_trims_leading_and_trailing_silence(self):
+        from data_processing.vad import trim_silence
+
+        audio = np.concatenate([self.silence, self.tone, self.silence])
+        trimmed = trim_silence(audio, top_db=40)
+        # Only the hangover frames around the tone survive.
+        assert len(self.tone) <= len(trimmed) < len(self.tone) + 6 * 512
+
+    def test_fully_silent_clip_is_empty(self):
+        from data_processing.vad import trim_silence
+
+        assert len(trim_silence(self.silence, top_db=40)) == 0
+
+    def test_vad_changes_schema_only_when_enabled(self):
+        plain = AudioProcessor().schema
+        gated = AudioProcessor(vad_top_db=40).schema
+        assert "vad_top_db" not in plain
+        assert gated["schema_id"] != plain["schema_id"]
+        assert AudioProcessor.from_schema(gated).vad_top_db == 40
+
+    def test_silent_file_is_skipped(self, tmp_path):
+        import soundfile as sf
+
+        path = str(tmp_path / "silent.wav")
+        sf.write(path, self.silence, 22050)
+        assert AudioProcessor(vad_top_db=40).extract_features(path) is None
+        assert AudioProcessor().extract_features(path) is not None
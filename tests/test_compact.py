@@ -0,0 +1,80 @@
+import sys
+import os
+import pickle
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sklearn.ensemble import RandomForestClassifier
+
+from data_processing.audio_processor import AudioProcessor
+from training.compact import CompactForest, compare_models
+
+
+class TestCompactForest:
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(600, 15))
+        self.y = (self.X[:, 0] + self.X[:, 1] > 0).astype(int) + (self.X[:, 2] > 1)
+        self.forest = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42)
+        self.forest.fit(self.X[:400], self.y[:400])
+        self.compact = CompactForest(self.forest)
+
+    def test_matches_full_precision_forest(self):
+        X_test = self.X[400:]
+        np.testing.assert_array_equal(self.compact.predict(X_test), self.forest.predict(X_test))
+        np.testing.assert_allclose(
+            self.compact.predict_proba(X_test), self.forest.predict_proba(X_test), atol=0.01
+        )
+
+    def test_is_smaller_when_pickled(self):
+        assert len(pickle.dumps(self.compact)) < len(pickle.dumps(self.forest))
+        assert self.compact.n_features_in_ == 15
+
+    def test_compare_models_report(self):
+        X_test = self.X[400:]
+        report = compare_models(
+            self.forest, self.compact, X_test, X_test.astype(np.float16), self.y[400:]
+        )
+        assert report["model_memory_saved"] > 0
+        assert report["feature_bytes_compact"] * 4 == report["feature_bytes_full"]
+        assert report["prediction_agreement"] > 0.95
+
+    def test_rejects_multi_output_forest(self):
+        forest = RandomForestClassifier(n_estimators=2).fit(self.X, np.c_[self.y, self.y])
+        with pytest.raises(ValueError):
+            CompactForest(forest)
+
+
+class TestCompactFeatures:
+    def test_processor_feature_dtype(self, tmp_path):
+        import soundfile as sf
+
+        class_dir = tmp_path / "Positive"
+        class_dir.mkdir()
+        sf.write(class_dir / "1.wav", np.random.randn(22050) * 0.1, 22050)
+
+        X, y = AudioProcessor(feature_dtype="float32").process_dataset(str(tmp_path))
+        assert X.dtype == np.float32
+        assert X.shape == (1, 15)
+
+    def test_prepare_data_keeps_float64_test_rows_on_request(self, tmp_path):
+        import soundfile as sf
+
+        rng = np.random.default_rng(0)
+        for i in range(12):
+            class_dir = tmp_path / ["Negative", "Positive"][i % 2]
+            class_dir.mkdir(exist_ok=True)
+            sf.write(class_dir / f"{i}.wav", rng.normal(0, 0.1, 22050), 22050)
+
+        processor = AudioProcessor(feature_dtype="float16")
+        X_train, X_test, _, _, _ = processor.prepare_data(str(tmp_path))
+        assert X_train.dtype == X_test.dtype == np.float16
+
+        X_train, X_test_full, _, _, _ = processor.prepare_data(
+            str(tmp_path), full_precision_test=True
+        )
+        assert X_train.dtype == np.float16
+        assert X_test_full.dtype == np.float64
+        np.testing.assert_array_equal(X_test_full.astype(np.float16), X_test)
@@ -0,0 +1,151 @@
+import sys
+import os
+import shutil
+import numpy as np
+import soundfile as sf
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing import audio_processor
+from data_processing.audio_processor import AudioProcessor, holdout_score
+from data_processing import dedup as dedup_module
+from data_processing.dedup import DuplicateIndex
+from data_processing.feature_cache import FeatureCache
+
+SAMPLE_RATE = 22050
+
+
+def speech_like_clip(rng, seconds=1.5):
+    """Random harmonic bursts, distinct enough per clip to act as separate utterances."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    audio = np.zeros_like(t)
+    for _ in range(5):
+        freq, onset, length = rng.uniform(100, 600), rng.uniform(0, seconds - 0.3), rng.uniform(0.1, 0.3)
+        envelope = ((t > onset) & (t < onset + length)).astype(float)
+        for harmonic in range(1, 4):
+            audio += envelope * np.sin(2 * np.pi * freq * harmonic * t) / harmonic
+    return 0.2 * audio + rng.normal(0, 0.01, size=t.shape)
+
+
+def write_corpus(data_dir, n_clips, rng):
+    clips = []
+    for i in range(n_clips):
+        label = ["Negative", "Positive"][i % 2]
+        (data_dir / label).mkdir(parents=True, exist_ok=True)
+        audio = speech_like_clip(rng)
+        sf.write(data_dir / label / f"{i}.wav", audio, SAMPLE_RATE)
+        clips.append((label, audio))
+    return clips
+
+
+class TestDuplicateIndex:
+    def test_skips_exact_duplicates_before_decoding(self, tmp_path):
+        write_corpus(tmp_path, 6, np.random.default_rng(0))
+        shutil.copy(tmp_path / "Negative" / "0.wav", tmp_path / "Negative" / "copy.wav")
+
+        processor = AudioProcessor()
+        decoded = []
+        original_analyze = processor.analyze
+        processor.analyze = lambda path: decoded.append(path) or original_analyze(path)
+
+        dedup = DuplicateIndex()
+        X, y = processor.process_dataset(str(tmp_path), dedup=dedup)
+
+        assert len(X) == 6
+        assert len(decoded) == 6
+        assert len(dedup.exact_duplicates) == 1
+
+    def test_cached_digests_skip_rereading_files(self, tmp_path, monkeypatch):
+        write_corpus(tmp_path / "data", 6, np.random.default_rng(0))
+        processor = AudioProcessor()
+        cache = FeatureCache(str(tmp_path / "cache"), processor.schema)
+        processor.process_dataset(str(tmp_path / "data"), cache=cache, dedup=DuplicateIndex())
+
+        hashed = []
+        monkeypatch.setattr(audio_processor, "file_digest", hashed.append)
+        monkeypatch.setattr(dedup_module, "file_digest", hashed.append)
+        X, _ = processor.process_dataset(str(tmp_path / "data"), cache=cache,
+                                         dedup=DuplicateIndex())
+        cache.close()
+
+        assert len(X) == 6
+        assert hashed == []
+
+    def test_near_duplicates_land_on_one_side_of_split(self, tmp_path):
+        clips = write_corpus(tmp_path, 20, np.random.default_rng(1))
+        # Re-ingested copies: quieter, slightly noisier, trimmed.
+        for i, (label, audio) in enumerate(clips[:4]):
+            reingest = 0.5 * audio[500:] + np.random.default_rng(i).normal(0, 0.002, len(audio) - 500)
+            sf.write(tmp_path / label / f"reingest_{i}.wav", reingest, SAMPLE_RATE)
+
+        dedup = DuplicateIndex()
+        X_train, X_test, _, _, _ = AudioProcessor().prepare_data(str(tmp_path), dedup=dedup)
+
+        groups = dedup.near_duplicate_groups()
+        assert len(np.unique(groups)) == 20
+        assert len(X_train) + len(X_test) == 24
+
+        # Rows of X_all line up with dedup.paths: same traversal, no duplicates skipped.
+        X_all, _ = AudioProcessor().process_dataset(str(tmp_path))
+        train_rows = {row.tobytes() for row in X_train}
+        for group in np.unique(groups):
+            sides = {X_all[i].tobytes() in train_rows for i in np.flatnonzero(groups == group)}
+            assert len(sides) == 1
+
+    def test_late_near_duplicate_does_not_move_its_group(self, tmp_path):
+        rng = np.random.default_rng(4)
+        write_corpus(tmp_path, 20, rng)
+        # An original on the training side, and a later re-ingested copy
+        # whose path sorts first and would on its own be held out.
+        original = next(f"Negative/orig_{i}.wav" for i in range(100)
+                        if holdout_score(f"Negative/orig_{i}.wav") >= 0.3)
+        late = next(f"Negative/a_copy_{i}.wav" for i in range(100)
+                    if holdout_score(f"Negative/a_copy_{i}.wav") < 0.3)
+        audio = speech_like_clip(rng)
+        sf.write(tmp_path / original, audio, SAMPLE_RATE)
+        os.utime(tmp_path / original, (1e9, 1e9))
+        sf.write(tmp_path / late, 0.5 * audio + rng.normal(0, 0.002, len(audio)), SAMPLE_RATE)
+
+        processor = AudioProcessor()
+        X_train, _, _, _, _ = processor.prepare_data(
+            str(tmp_path), dedup=DuplicateIndex(), stable_holdout=True
+        )
+        for name in (original, late):
+            features = processor.extract_features(str(tmp_path / name))
+            assert np.isclose(X_train, features).all(axis=1).any(), name
+
+    def test_similar_distinct_clips_are_not_grouped(self, tmp_path):
+        # Steady tones with their own noise and a slightly different pitch:
+        # distinct recordings whose coarse fingerprints are nearly identical.
+        rng = np.random.default_rng(3)
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        for i in range(45):
+            label, freq = [("Negative", 220.0), ("Neutral", 440.0), ("Positive", 880.0)][i % 3]
+            audio = 0.3 * np.sin(2 * np.pi * freq * (1 + rng.normal(0, 0.05)) * t)
+            (tmp_path / label).mkdir(exist_ok=True)
+            sf.write(tmp_path / label / f"{i}.wav", audio + rng.normal(0, 0.05, t.shape), SAMPLE_RATE)
+
+        dedup = DuplicateIndex()
+        _, _, y_train, y_test, _ = AudioProcessor().prepare_data(str(tmp_path), dedup=dedup)
+
+        assert np.bincount(dedup.near_duplicate_groups()).max() <= dedup.max_group_size
+        assert set(y_train) == set(y_test) == {0, 1, 2}
+
+    def test_lsh_matches_brute_force(self):
+        rng = np.random.default_rng(2)
+        # A shared offset mimics the common spectral tilt of real fingerprints.
+        base = rng.normal(size=(3000, 128)) + rng.normal(size=128)
+        copies = base[:300] + rng.normal(scale=0.1, size=(300, 128))
+        fingerprints = np.vstack([base, copies])
+        fingerprints = np.round(fingerprints / np.abs(fingerprints).max() * 127).astype(np.int8)
+
+        exact, approximate = DuplicateIndex(), DuplicateIndex(brute_force_limit=0)
+        for i, fingerprint in enumerate(fingerprints):
+            exact.add(str(i), fingerprint)
+            approximate.add(str(i), fingerprint)
+
+        expected = {tuple(p) for p in exact.near_duplicate_pairs()}
+        found = {tuple(p) for p in approximate.near_duplicate_pairs()}
+        assert len(expected) == 300
+        assert found <= expected
+        assert len(found) / len(expected) > 0.95
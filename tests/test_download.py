@@ -0,0 +1,193 @@
+import sys
+import os
+import io
+import hashlib
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing.download import (
+    archive_layout, download_file, extract_archive,
+)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves server.payload with Range support; can drop the first response early."""
+
+    def do_GET(self):
+        payload = self.server.payload
+        self.server.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(payload):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(payload)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(payload) - 1}/{len(payload)}",
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(payload) - start))
+        self.end_headers()
+
+        body = payload[start:]
+        if self.server.cut_after is not None:
+            body, self.server.cut_after = body[:self.server.cut_after], None
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.payload = os.urandom(300000)
+    httpd.ranges = []
+    httpd.cut_after = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/dataset.zip"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestDownload:
+    def test_download_with_checksum(self, server, tmp_path):
+        dest = str(tmp_path / "dataset.zip")
+        sha256 = hashlib.sha256(server.payload).hexdigest()
+        download_file(server.url, dest, sha256=sha256)
+        assert open(dest, "rb").read() == server.payload
+        assert not os.path.exists(dest + ".part")
+
+    def test_resumes_partial_download(self, server, tmp_path):
+        dest = str(tmp_path / "dataset.zip")
+        with open(dest + ".part", "wb") as f:
+            f.write(server.payload[:100000])
+        digest = hashlib.sha256(server.payload).hexdigest()
+        download_file(server.url, dest, sha256=digest)
+        assert server.ranges == ["bytes=100000-"]
+        assert open(dest, "rb").read() == server.payload
+
+    def test_complete_partial_file_is_kept(self, server, tmp_path):
+        dest = str(tmp_path / "dataset.zip")
+        with open(dest + ".part", "wb") as f:
+            f.write(server.payload)
+        download_file(server.url, dest)
+        assert server.ranges == [f"bytes={len(server.payload)}-"]
+        assert open(dest, "rb").read() == server.payload
+
+    def test_restarts_stale_oversized_partial_file(self, server, tmp_path):
+        dest = str(tmp_path / "dataset.zip")
+        with open(dest + ".part", "wb") as f:
+            f.write(os.urandom(len(server.payload) + 1000))
+        download_file(server.url, dest)
+        assert server.ranges == [f"bytes={len(server.payload) + 1000}-", None]
+        assert open(dest, "rb").read() == server.payload
+
+    def test_retries_dropped_connection(self, server, tmp_path):
+        server.cut_after = 200000
+        dest = str(tmp_path / "dataset.zip")
+        download_file(server.url, dest, retries=2)
+        # Whole chunks received before the drop are kept and not fetched again.
+        assert server.ranges[0] is None
+        assert len(server.ranges) == 2 and server.ranges[1].startswith("bytes=")
+        assert open(dest, "rb").read() == server.payload
+
+    def test_checksum_mismatch(self, server, tmp_path):
+        dest = str(tmp_path / "dataset.zip")
+        with pytest.raises(ValueError):
+            download_file(server.url, dest, sha256="0" * 64)
+        assert not os.path.exists(dest)
+        assert not os.path.exists(dest + ".part")
+
+
+def _wav_bytes(sample_rate, seconds=0.5):
+    import soundfile as sf
+
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    buffer = io.BytesIO()
+    sf.write(buffer, 0.5 * np.sin(2 * np.pi * 440 * t), sample_rate,
+             format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+class TestExtract:
+    def setup_method(self):
+        self.members = {
+            "audio-speech-sentiment/TRAIN/1.wav": _wav_bytes(44100),
+            "audio-speech-sentiment/TRAIN/2.wav": _wav_bytes(22050),
+            "audio-speech-sentiment/TRAIN.csv": (
+                b"Filename,Class\n1.wav,Positive\n2.wav,Negative\n"
+            ),
+        }
+
+    def _archive(self, tmp_path, members=None):
+        path = str(tmp_path / "dataset.zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in (members or self.members).items():
+                archive.writestr(name, data)
+        return path
+
+    def test_strips_wrapping_directory(self):
+        layout = archive_layout(["top/", "top/TRAIN/1.wav", "top/TRAIN.csv"])
+        assert layout == {
+            "top/TRAIN/1.wav": "TRAIN/1.wav",
+            "top/TRAIN.csv": "TRAIN.csv",
+        }
+
+    def test_keeps_top_level_train_directory(self):
+        layout = archive_layout(["TRAIN/", "TRAIN/1.wav", "TRAIN/2.wav"])
+        assert layout == {"TRAIN/1.wav": "TRAIN/1.wav", "TRAIN/2.wav": "TRAIN/2.wav"}
+
+    def test_rejects_path_traversal(self):
+        with pytest.raises(ValueError):
+            archive_layout(["TRAIN/1.wav", "../evil.sh"])
+
+    def test_extracts_into_processor_layout(self, tmp_path):
+        data_dir = tmp_path / "data"
+        archive = self._archive(tmp_path)
+        assert extract_archive(archive, str(data_dir), workers=2) == (3, 0)
+        members = self.members
+        assert ((data_dir / "TRAIN.csv").read_bytes()
+                == members["audio-speech-sentiment/TRAIN.csv"])
+        assert ((data_dir / "TRAIN" / "1.wav").read_bytes()
+                == members["audio-speech-sentiment/TRAIN/1.wav"])
+        # A second run finds everything in place.
+        assert extract_archive(self._archive(tmp_path), str(data_dir)) == (0, 3)
+
+    def test_closes_archive_handles(self, tmp_path, monkeypatch):
+        opened = []
+        original_init = zipfile.ZipFile.__init__
+
+        def tracking_init(archive, *args, **kwargs):
+            original_init(archive, *args, **kwargs)
+            opened.append(archive)
+
+        monkeypatch.setattr(zipfile.ZipFile, "__init__", tracking_init)
+        extract_archive(self._archive(tmp_path), str(tmp_path / "data"), workers=2)
+        assert len(opened) >= 2
+        assert all(archive.fp is None for archive in opened)
+
+    def test_resamples_wavs(self, tmp_path):
+        import soundfile as sf
+
+        data_dir = tmp_path / "data"
+        extract_archive(self._archive(tmp_path), str(data_dir),
+                        sample_rate=22050, workers=2)
+        for name in ("1.wav", "2.wav"):
+            info = sf.info(str(data_dir / "TRAIN" / name))
+            assert info.samplerate == 22050
+            assert info.frames == 11025
+        assert (data_dir / "TRAIN.csv").exists()
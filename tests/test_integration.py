@@ -2,11 +2,15 @@ import sys
 import os
 import requests
 import time
+import signal
+import socket
 import subprocess
 import pytest
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+API_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment', 'api.py')
+
 
 class TestModelDeployment:
     @classmethod
@@ -41,3 +45,87 @@ class TestModelDeployment:
             assert response.status_code == 422  # Validation error
         except requests.exceptions.RequestException:
             pytest.skip("API server not running")
+    
+    def test_ready_endpoint(self):
+        try:
+            response = requests.get(f"{self.base_url}/ready", timeout=10)
+            assert response.status_code in (200, 503)
+            assert response.json()["status"] in ("ready", "warming_up")
+        except requests.exceptions.RequestException:
+            pytest.skip("API server not running")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="needs /proc")
+class TestPreforkSupervisor:
+    def _children(self, pid):
+        path = f"/proc/{pid}/task/{pid}/children"
+        return set(open(path).read().split()) if os.path.exists(path) else set()
+
+    def _wait_for(self, condition, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            result = condition()
+            if result:
+                return result
+            time.sleep(0.2)
+        return None
+
+    def _start_server(self, tmp_path, workers=2):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = dict(os.environ, API_WORKERS=str(workers), API_PORT=str(port),
+                   MODEL_DIR=str(tmp_path), JOB_DIR=str(tmp_path / "jobs"))
+        return subprocess.Popen([sys.executable, API_SCRIPT], env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def test_jobs_of_killed_worker_are_requeued(self, tmp_path):
+        from deployment.jobs import JobStore
+
+        process = self._start_server(tmp_path)
+        try:
+            workers = self._wait_for(
+                lambda: len(self._children(process.pid)) == 2 and self._children(process.pid)
+            )
+            assert workers, "workers did not start"
+
+            # Stand in for a job the worker claimed and was running when killed.
+            killed = int(sorted(workers)[0])
+            store = JobStore(str(tmp_path / "jobs" / "jobs.db"))
+            upload = tmp_path / "jobs" / "uploads" / "abc.upload"
+            upload.parent.mkdir(parents=True, exist_ok=True)
+            upload.write_bytes(b"audio")
+            store.create("abc", str(upload))
+            with store._connect() as conn:
+                conn.execute("UPDATE jobs SET status = 'running', owner_pid = ?", (killed,))
+            os.kill(killed, signal.SIGKILL)
+
+            # The replacement worker runs it again; with no model it fails.
+            job = self._wait_for(
+                lambda: store.get("abc")["status"] not in ("queued", "running")
+                and store.get("abc")
+            )
+            assert job, "job of the killed worker was never rerun"
+            assert job["status"] == "failed"
+            assert not upload.exists()
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def test_crashed_worker_is_respawned(self, tmp_path):
+        process = self._start_server(tmp_path)
+        try:
+            workers = self._wait_for(
+                lambda: len(self._children(process.pid)) == 2 and self._children(process.pid)
+            )
+            assert workers, "workers did not start"
+
+            crashed = sorted(workers)[0]
+            os.kill(int(crashed), 9)
+            respawned = self._wait_for(
+                lambda: len(self._children(process.pid) - {crashed}) == 2
+            )
+            assert respawned, "crashed worker was not replaced"
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
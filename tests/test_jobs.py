@@ -0,0 +1,247 @@
+import sys
+import os
+import time
+import signal
+import asyncio
+import threading
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from deployment.jobs import (
+    JobQueue, JobStore, MissingUpload, QueueFull, UploadTooLarge, save_upload
+)
+
+
+class FakeRequest:
+    def __init__(self, data, chunk_size=3, headers=None):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.headers = headers or {}
+        self.consumed = 0
+
+    async def stream(self):
+        for start in range(0, len(self.data), self.chunk_size):
+            chunk = self.data[start:start + self.chunk_size]
+            self.consumed += len(chunk)
+            yield chunk
+
+
+def multipart_body(field, content, boundary="xyzBOUNDARY"):
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="clip.wav"\r\n'
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+
+class TestSaveUpload:
+    def test_writes_raw_body_in_chunks(self, tmp_path):
+        dest = tmp_path / "upload.wav"
+        written = asyncio.run(save_upload(FakeRequest(b"x" * 10), str(dest), 100))
+        assert written == 10
+        assert dest.read_bytes() == b"x" * 10
+
+    def test_extracts_multipart_field(self, tmp_path):
+        dest = tmp_path / "upload.wav"
+        body, headers = multipart_body("file", b"RIFF" + bytes(range(256)))
+        asyncio.run(save_upload(FakeRequest(body, chunk_size=7, headers=headers), str(dest), 10000))
+        assert dest.read_bytes() == b"RIFF" + bytes(range(256))
+
+    def test_missing_field(self, tmp_path):
+        dest = tmp_path / "upload.wav"
+        body, headers = multipart_body("other", b"data")
+        with pytest.raises(MissingUpload):
+            asyncio.run(save_upload(FakeRequest(body, headers=headers), str(dest), 10000))
+        with pytest.raises(MissingUpload):
+            asyncio.run(save_upload(FakeRequest(b""), str(dest), 10000))
+        assert not dest.exists()
+
+    def test_rejects_oversized_upload(self, tmp_path):
+        dest = tmp_path / "upload.wav"
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(save_upload(FakeRequest(b"x" * 10), str(dest), 5))
+        assert not dest.exists()
+
+    def test_rejects_on_content_length_before_reading(self, tmp_path):
+        dest = tmp_path / "upload.wav"
+        request = FakeRequest(b"x" * 10, headers={"content-length": "10"})
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(save_upload(request, str(dest), 5))
+        assert request.consumed == 0
+        assert not dest.exists()
+
+
+class TestJobQueue:
+    def setup_method(self):
+        self.release = threading.Event()
+
+    def _make_queue(self, tmp_path, handler, max_depth=10):
+        store = JobStore(str(tmp_path / "jobs.db"))
+        return JobQueue(store, handler, str(tmp_path / "uploads"), workers=1, max_depth=max_depth)
+
+    def _submit(self, queue, data=b"audio"):
+        job_id, path = queue.new_upload_path()
+        with open(path, "wb") as f:
+            f.write(data)
+        return queue.submit(job_id, path), path
+
+    def test_job_completes(self, tmp_path):
+        queue = self._make_queue(tmp_path, lambda path: {"size": os.path.getsize(path)})
+        job_id, path = self._submit(queue)
+
+        job = queue.wait(job_id, timeout=5)
+        assert job["status"] == "done"
+        assert job["result"] == {"size": 5}
+        assert not os.path.exists(path)
+        queue.shutdown()
+
+    def test_failed_job_records_error(self, tmp_path):
+        def handler(path):
+            raise ValueError("bad audio")
+
+        queue = self._make_queue(tmp_path, handler)
+        job_id, _ = self._submit(queue)
+
+        job = queue.wait(job_id, timeout=5)
+        assert job["status"] == "failed"
+        assert job["error"] == "bad audio"
+        queue.shutdown()
+
+    def test_queue_depth_is_bounded(self, tmp_path):
+        def handler(path):
+            self.release.wait(5)
+            return {}
+
+        queue = self._make_queue(tmp_path, handler, max_depth=1)
+        running_id, _ = self._submit(queue)
+        # Wait for the single worker to claim the first job.
+        deadline = time.monotonic() + 5
+        while queue.store.get(running_id)["status"] != "running":
+            assert time.monotonic() < deadline, "worker never claimed the job"
+            time.sleep(0.01)
+        self._submit(queue)
+
+        with pytest.raises(QueueFull):
+            queue.check_capacity()
+        with pytest.raises(QueueFull):
+            self._submit(queue)
+
+        self.release.set()
+        queue.shutdown()
+
+    def test_recover_requeues_interrupted_jobs(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.db"))
+        upload = tmp_path / "pending.upload"
+        upload.write_bytes(b"audio")
+        store.create("abc", str(upload))
+        assert store.claim("abc")
+
+        queue = JobQueue(store, lambda path: {"ok": True}, str(tmp_path / "uploads"), workers=1)
+        queue.recover()
+
+        assert queue.wait("abc", timeout=5)["status"] == "done"
+        queue.shutdown()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+    def test_job_of_killed_process_is_requeued(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.db"))
+        upload = tmp_path / "pending.upload"
+        upload.write_bytes(b"audio")
+        store.create("abc", str(upload))
+
+        pid = os.fork()
+        if pid == 0:
+            # A worker that claims the job and hangs until it is killed.
+            queue = JobQueue(store, lambda path: time.sleep(60), str(tmp_path / "uploads"))
+            queue.recover(reset_running=False)
+            time.sleep(60)
+            os._exit(0)
+        try:
+            deadline = time.monotonic() + 10
+            while store.get("abc")["status"] != "running":
+                assert time.monotonic() < deadline, "worker never claimed the job"
+                time.sleep(0.05)
+        finally:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+        assert store.requeue_interrupted(owner_pid=pid + 1) == 0
+        assert store.requeue_interrupted(owner_pid=pid) == 1
+        queue = JobQueue(store, lambda path: {"ok": True}, str(tmp_path / "uploads"), workers=1)
+        queue.recover(reset_running=False)
+
+        assert queue.wait("abc", timeout=5)["status"] == "done"
+        assert not upload.exists()
+        queue.shutdown()
+
+    def test_purges_expired_finished_jobs(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.db"))
+        for job_id in ("old-done", "old-failed", "old-queued", "new-done"):
+            store.create(job_id, str(tmp_path / f"{job_id}.upload"))
+        store.finish("old-done", {})
+        store.fail("old-failed", "bad audio")
+        store.finish("new-done", {})
+        with store._connect() as conn:
+            conn.execute("UPDATE jobs SET updated_at = 0 WHERE id LIKE 'old-%'")
+
+        queue = JobQueue(store, lambda path: {}, str(tmp_path / "uploads"), workers=1,
+                         retention_seconds=3600)
+        assert queue.purge_expired() == 2
+        assert store.get("old-done") is None and store.get("old-failed") is None
+        assert store.get("old-queued")["status"] == "queued"
+        assert store.get("new-done")["status"] == "done"
+        queue.shutdown()
+
+    def test_unknown_job(self, tmp_path):
+        queue = self._make_queue(tmp_path, lambda path: {})
+        assert queue.wait("missing", timeout=0) is None
+        queue.shutdown()
+
+
+class TestUploadEndpoints:
+    """Rejections must happen before the upload body is consumed."""
+
+    def setup_method(self):
+        from fastapi.testclient import TestClient
+        import deployment.api as api
+
+        self.api = api
+        # No context manager: skip the startup event (and its model warm-up).
+        self.client = TestClient(api.app)
+        self.saved = api.job_queue, api.MAX_UPLOAD_BYTES, api.ready.is_set()
+        api.ready.set()
+
+    def teardown_method(self):
+        self.api.job_queue.shutdown()
+        self.api.job_queue, self.api.MAX_UPLOAD_BYTES, was_ready = self.saved
+        if not was_ready:
+            self.api.ready.clear()
+
+    def _queue(self, tmp_path, max_depth):
+        store = JobStore(str(tmp_path / "jobs.db"))
+        self.api.job_queue = JobQueue(
+            store, lambda path: {"size": os.path.getsize(path)},
+            str(tmp_path / "uploads"), workers=1, max_depth=max_depth,
+        )
+
+    def test_job_upload(self, tmp_path):
+        self._queue(tmp_path, max_depth=10)
+        response = self.client.post("/jobs", files={"file": ("clip.wav", b"audio")})
+        assert response.status_code == 202
+        job = self.api.job_queue.wait(response.json()["job_id"], timeout=5)
+        assert job["result"] == {"size": 5}
+
+    def test_oversized_upload_rejected(self, tmp_path):
+        self._queue(tmp_path, max_depth=10)
+        self.api.MAX_UPLOAD_BYTES = 100
+        response = self.client.post("/jobs", files={"file": ("clip.wav", b"x" * 1000)})
+        assert response.status_code == 413
+        assert os.listdir(tmp_path / "uploads") == []
+
+    def test_full_queue_rejected(self, tmp_path):
+        self._queue(tmp_path, max_depth=0)
+        response = self.client.post("/jobs", files={"file": ("clip.wav", b"audio")})
+        assert response.status_code == 429
+        assert os.listdir(tmp_path / "uploads") == []
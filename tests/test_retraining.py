@@ -0,0 +1,151 @@
+import sys
+import os
+import sqlite3
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sklearn.ensemble import RandomForestClassifier
+
+from data_processing.audio_processor import AudioProcessor
+from data_processing.feature_cache import FeatureCache
+from monitoring.monitor import monitor_traffic
+from monitoring.traffic import TrafficLog
+from training.retrain import check_live_drift, run_retraining_cycle
+from training.train import ModelTrainer
+
+
+class LocalTrainer(ModelTrainer):
+    """ModelTrainer without MLflow tracking."""
+
+    def __init__(self, accuracy=None):
+        self.accuracy = accuracy
+
+    def train_model(self, X_train, y_train, X_test, y_test, label_encoder=None):
+        model = RandomForestClassifier(n_estimators=10, random_state=42).fit(X_train, y_train)
+        accuracy = float(np.mean(model.predict(X_test) == y_test))
+        return model, self.accuracy if self.accuracy is not None else accuracy
+
+
+def write_clips(data_dir, n_clips, start=0):
+    rng = np.random.default_rng(start)
+    for i in range(start, start + n_clips):
+        label, freq = [("Negative", 220.0), ("Positive", 880.0)][i % 2]
+        # Step the pitch so clips are distinct rather than near duplicates.
+        freq *= 1 + 0.1 * (i // 2)
+        t = np.arange(11025) / 22050
+        audio = 0.3 * np.sin(2 * np.pi * freq * t) + rng.normal(0, 0.05, size=t.shape)
+        (data_dir / label).mkdir(parents=True, exist_ok=True)
+        sf.write(data_dir / label / f"{i}.wav", audio, 22050)
+
+
+class TestFeatureCache:
+    def test_hits_after_first_pass(self, tmp_path):
+        write_clips(tmp_path / "data", 4)
+        processor = AudioProcessor()
+        cache = FeatureCache(str(tmp_path / "cache"), processor.schema)
+
+        X_cold, _ = processor.process_dataset(str(tmp_path / "data"), cache=cache)
+        X_warm, _ = processor.process_dataset(str(tmp_path / "data"), cache=cache)
+        cache.close()
+
+        assert (cache.misses, cache.hits) == (4, 4)
+        np.testing.assert_array_equal(X_cold, X_warm)
+
+    def test_rejects_cache_for_other_schema(self, tmp_path):
+        write_clips(tmp_path / "data", 2)
+        cache = FeatureCache(str(tmp_path / "cache"), AudioProcessor().schema)
+        with pytest.raises(ValueError):
+            AudioProcessor(feature_sets="extended").process_dataset(str(tmp_path / "data"), cache=cache)
+        cache.close()
+
+    def test_adds_digest_column_to_old_cache(self, tmp_path):
+        schema = AudioProcessor().schema
+        path = tmp_path / f"features-{schema['schema_id']}.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute("CREATE TABLE features ("
+                     " key TEXT PRIMARY KEY, vector BLOB NOT NULL, fingerprint BLOB)")
+        conn.close()
+
+        write_clips(tmp_path / "data", 1)
+        clip = str(tmp_path / "data" / "Negative" / "0.wav")
+        cache = FeatureCache(str(tmp_path), schema)
+        cache.put(clip, np.zeros(15))
+        cache.put_digest(clip, "abc")
+        assert cache.get_digest(clip) == "abc"
+        cache.close()
+
+
+class TestRetrainingCycle:
+    def test_incremental_cycle_only_featurizes_new_files(self, tmp_path):
+        data_dir, model_dir, cache_dir = (str(tmp_path / d) for d in ("data", "models", "cache"))
+        write_clips(tmp_path / "data", 12)
+
+        first = run_retraining_cycle(data_dir, model_path=model_dir, cache_dir=cache_dir,
+                                     trainer=LocalTrainer())
+        assert first["promoted"]
+        assert first["current_accuracy"] is None
+        assert os.path.exists(os.path.join(model_dir, "reference_features.npy"))
+
+        write_clips(tmp_path / "data", 4, start=12)
+        second = run_retraining_cycle(data_dir, model_path=model_dir, cache_dir=cache_dir,
+                                      trainer=LocalTrainer(accuracy=0.0))
+        assert (second["new_files"], second["cached_files"]) == (4, 12)
+        assert not second["promoted"]
+        assert set(second["timings"]) == {"featurize", "train", "evaluate", "promote", "total"}
+
+
+class TestHoldout:
+    def test_new_files_do_not_move_held_out_files(self, tmp_path):
+        write_clips(tmp_path / "data", 12)
+        processor = AudioProcessor()
+        _, X_test_before, _, _, _ = processor.prepare_data(
+            str(tmp_path / "data"), stable_holdout=True
+        )
+
+        write_clips(tmp_path / "data", 8, start=12)
+        X_train, X_test, _, _, _ = processor.prepare_data(
+            str(tmp_path / "data"), stable_holdout=True
+        )
+
+        assert 0 < len(X_test_before) < 12
+        held_out = {row.tobytes() for row in X_test}
+        assert all(row.tobytes() in held_out for row in X_test_before)
+        assert not held_out & {row.tobytes() for row in X_train}
+
+    def test_default_split_is_stratified(self, tmp_path):
+        write_clips(tmp_path / "data", 4)
+        _, _, y_train, y_test, _ = AudioProcessor().prepare_data(str(tmp_path / "data"))
+        assert sorted(y_train) == sorted(y_test) == [0, 1]
+
+
+class TestDriftCheck:
+    def setup_method(self):
+        self.schema = AudioProcessor().schema
+        self.reference = np.random.default_rng(0).normal(size=(200, 15))
+
+    def _log(self, tmp_path, features):
+        log = TrafficLog(str(tmp_path / "logs"), self.schema, ["Negative", "Positive"])
+        for row in features:
+            log.append(row, 0, 0.9)
+        return log
+
+    def test_detects_shifted_traffic(self, tmp_path):
+        log = self._log(tmp_path, self.reference[:100] + 2.0)
+        drift_detected, drift_score, n_samples = monitor_traffic(self.reference, log)
+        assert drift_detected
+        assert drift_score == 1.0
+        assert n_samples == 100
+
+    def test_matching_traffic_is_not_drift(self, tmp_path):
+        log = self._log(tmp_path, self.reference[:100])
+        assert not monitor_traffic(self.reference, log)[0]
+
+    def test_too_few_samples(self, tmp_path):
+        log = self._log(tmp_path, self.reference[:10] + 2.0)
+        assert monitor_traffic(self.reference, log) == (False, 0.0, 10)
+
+    def test_live_drift_without_reference(self, tmp_path):
+        assert check_live_drift(str(tmp_path / "models"), str(tmp_path / "logs")) == (False, 0.0, 0)
@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# Generous bound for slow CI runners; importing librosa/sklearn/mlflow
+# eagerly blows well past it.
+MAX_IMPORT_SECONDS = 3.0
+
+HEAVY_MODULES = ['librosa', 'numba', 'sklearn', 'mlflow']
+
+
+def _import_in_subprocess(module):
+    code = (
+        "import sys, time, json\n"
+        f"sys.path.insert(0, {os.path.abspath(SRC_DIR)!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartupTime:
+    def test_api_import_is_lazy(self):
+        result = _import_in_subprocess("deployment.api")
+        assert result['heavy'] == []
+        assert result['elapsed'] < MAX_IMPORT_SECONDS
+
+    def test_audio_processor_import_is_lazy(self):
+        result = _import_in_subprocess("data_processing.audio_processor")
+        assert result['heavy'] == []
+
+    def test_trainer_import_is_lazy(self):
+        result = _import_in_subprocess("training.train")
+        assert result['heavy'] == []
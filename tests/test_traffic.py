@@ -0,0 +1,95 @@
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sklearn.ensemble import RandomForestClassifier
+
+from data_processing.audio_processor import AudioProcessor
+from monitoring.traffic import TrafficLog, evaluate_traffic, latest_traffic_log
+
+
+class TestTrafficLog:
+    def setup_method(self):
+        self.schema = AudioProcessor().schema
+        self.classes = ["Negative", "Neutral", "Positive"]
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(50, 15))
+        self.y = rng.integers(0, 3, size=50)
+
+    def _fill(self, log, model):
+        proba = model.predict_proba(self.X)
+        for features, p in zip(self.X, proba):
+            log.append(features, p.argmax(), p.max())
+
+    def test_append_and_read(self, tmp_path):
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        log.append(self.X[0], 2, 0.75)
+        log.append(self.X[1], 0, 0.5)
+
+        records = TrafficLog.open(log.path).read()
+        assert len(records) == 2
+        assert records["prediction"].tolist() == [2, 0]
+        np.testing.assert_allclose(records["features"][0], self.X[0], rtol=1e-6)
+
+    def test_ignores_partial_trailing_record(self, tmp_path):
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        log.append(self.X[0], 1, 0.9)
+        with open(log.path, "ab") as f:
+            f.write(b"\x00" * 7)
+        assert len(log.read()) == 1
+
+    def test_evaluate_with_shadow_model(self, tmp_path):
+        live = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        self._fill(log, live)
+
+        metrics = evaluate_traffic(log, shadow_model=live)
+        assert metrics["n_samples"] == 50
+        assert sum(metrics["prediction_distribution"].values()) == 50
+        assert sum(metrics["live_confidence"]["histogram"]) == 50
+        assert metrics["shadow"]["agreement"] == 1.0
+        assert abs(metrics["shadow"]["mean_confidence_delta"]) < 1e-6
+
+        candidate = RandomForestClassifier(n_estimators=10, random_state=1).fit(
+            self.X, np.roll(self.y, 1)
+        )
+        assert evaluate_traffic(log, shadow_model=candidate)["shadow"]["agreement"] < 1.0
+
+    def test_shadow_agreement_compares_decoded_labels(self, tmp_path):
+        live = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        self._fill(log, live)
+
+        # Same decisions from a candidate whose encoder dropped "Neutral" and
+        # ordered the remaining classes differently.
+        live_labels = np.asarray(self.classes)[live.predict(self.X)]
+        candidate_classes = ["Positive", "Negative"]
+        known = live_labels != "Neutral"
+        candidate_y = np.array([candidate_classes.index(c) for c in live_labels[known]])
+        candidate = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+            self.X[known], candidate_y
+        )
+        agreement = np.mean(
+            np.asarray(candidate_classes)[candidate.predict(self.X)] == live_labels
+        )
+
+        metrics = evaluate_traffic(log, shadow_model=candidate,
+                                   shadow_classes=candidate_classes)
+        assert metrics["shadow"]["agreement"] == agreement
+        assert metrics["shadow"]["per_class_agreement"]["Neutral"] == 0.0
+
+    def test_new_classes_start_a_new_log(self, tmp_path):
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        log.append(self.X[0], 2, 0.75)
+        retrained = TrafficLog(str(tmp_path), self.schema, ["Negative", "Positive"])
+        assert retrained.path != log.path
+        assert len(retrained.read()) == 0
+        assert TrafficLog.open(log.path).classes == self.classes
+
+    def test_empty_log(self, tmp_path):
+        log = TrafficLog(str(tmp_path), self.schema, self.classes)
+        assert evaluate_traffic(log) == {"n_samples": 0}
+        assert latest_traffic_log(str(tmp_path)) is None
+        assert latest_traffic_log(str(tmp_path / "missing")) is None